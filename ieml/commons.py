@@ -4,8 +4,9 @@ import logging
 import os
 import pickle
 from collections import OrderedDict
+from collections.abc import Sequence
 from enum import Enum
-from itertools import chain
+from itertools import chain, product
 from sys import stderr
 from typing import List
 import hashlib
@@ -32,7 +33,98 @@ class LastUpdatedOrderedDict(OrderedDict):
         OrderedDict.__setitem__(self, key, value, **kwargs)
 
 
+class ProductSequence(Sequence):
+    """
+    A lazy sequence of the cartesian product of factors sequences, in the order of itertools.product.
+    The elements are built on access from their components tuple, and are never all held in memory.
+    """
+    def __init__(self, factors, build, decompose=None):
+        """
+        :param factors: a list of sequences
+        :param build: a function components tuple -> element
+        :param decompose: a function element -> components tuple (or None if the element can't be decomposed),
+        required by index_of and __contains__
+        """
+        self.factors = tuple(factors)
+        self.build = build
+        self.decompose = decompose
+
+        self._len = 1
+        for f in self.factors:
+            self._len *= len(f)
+
+        # for each factor, a dict component -> index, built on demand
+        self._factors_index = [None] * len(self.factors)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(self._len))]
+
+        if item < 0:
+            item += self._len
+        if not 0 <= item < self._len:
+            raise IndexError("ProductSequence index out of range")
+
+        # mixed radix decomposition, the last factor varies the fastest
+        components = []
+        for f in reversed(self.factors):
+            item, i = divmod(item, len(f))
+            components.append(f[i])
+
+        return self.build(tuple(reversed(components)))
+
+    def __iter__(self):
+        for components in product(*self.factors):
+            yield self.build(components)
+
+    def __contains__(self, item):
+        return self.index_of(item) is not None
+
+    def index(self, value, start=0, stop=None):
+        i = self.index_of(value)
+        if i is None or i < start or (stop is not None and i >= stop):
+            raise ValueError("{} is not in the sequence".format(str(value)))
+        return i
+
+    def index_of(self, item):
+        """
+        The index of item in the sequence, each of its components is looked up in its factor.
+
+        :return: the index or None if item is not in the sequence
+        """
+        if self.decompose is None:
+            raise ValueError("The elements of this sequence can't be decomposed")
+
+        components = self.decompose(item)
+        if components is None or len(components) != len(self.factors):
+            return None
+
+        res = 0
+        for k, (f, c) in enumerate(zip(self.factors, components)):
+            i = self._factor_index_of(k, c)
+            if i is None:
+                return None
+            res = res * len(f) + i
+
+        return res
+
+    def _factor_index_of(self, k, component):
+        f = self.factors[k]
+        if isinstance(f, ProductSequence):
+            return f.index_of(component)
+
+        if self._factors_index[k] is None:
+            self._factors_index[k] = {e: i for i, e in reversed(list(enumerate(f)))}
+
+        return self._factors_index[k].get(component)
+
+
 class TreeStructure:
+    __slots__ = ('_str', '_paths', 'children')
+
     def __init__(self, *args, **kwargs):
         self._str = None
         self._paths = None
@@ -209,22 +301,8 @@ def cache_results_watch_files(path, name):
 
 
 class DecoratedComponent:
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self._literal = None
-
-    def clear_literal(self):
-        self._literal = None
-
-    def set_literal(self, value):
-        from ieml.usl.decoration.instance import literal_context
-
-        literal_context().push(self)
-        self._literal = value
-
-    def get_literal(self):
-        return self._literal
+    # the components an InstancedUSL can decorate, the decorations are kept by the InstancedUSL and keyed by path
+    __slots__ = ()
 
 class OrderedEnum(Enum):
     def __ge__(self, other):
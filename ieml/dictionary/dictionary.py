@@ -10,7 +10,13 @@ from ieml.dictionary.table.table_structure import TableStructure
 
 
 class Dictionary:
-    def __init__(self, paradigms, structure):
+    def __init__(self, paradigms, structure, workers=None, timing_hook=None):
+        """
+        :param paradigms: the list of the paradigms strings
+        :param structure: the dictionary structure (root paradigms, inhibitions and ignored paradigms)
+        :param workers: the number of processes used to compute the relations
+        :param timing_hook: a callable (relation family, seconds) reporting the relations computation time
+        """
         scripts = {s: script(s, factorize=False) for s in tqdm(paradigms, "Loading dictionary")}
 
         root_paradigms = []
@@ -64,7 +70,7 @@ class Dictionary:
         self.roots_idx = np.zeros((len(self.scripts),), dtype=int)
         self.roots_idx[[self.index[r] for r in root_paradigms]] = 1
 
-        self.relations = RelationsGraph(dictionary=self)
+        self.relations = RelationsGraph(dictionary=self, workers=workers, timing_hook=timing_hook)
 
     # def __new__(cls, *args, **kwargs):
     #     """
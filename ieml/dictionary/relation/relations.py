@@ -1,21 +1,52 @@
-from itertools import groupby, combinations, permutations, chain, repeat
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import groupby, permutations, chain, repeat
+from time import time
+import zipfile
 
 import numpy as np
 import pandas
 
 from scipy.sparse.coo import coo_matrix
 from scipy.sparse.csr import csr_matrix
+from scipy.sparse.csc import csc_matrix
+from scipy.sparse.construct import diags, identity
 from scipy.sparse.dok import dok_matrix
+from scipy.sparse.csgraph import breadth_first_order
 
 from ieml.constants import RELATIONS
 from ieml.dictionary.script.script import MultiplicativeScript, AdditiveScript, NullScript
 
+
+# number of subjects read at once by RelationsGraph.iter_edges
+EDGES_CHUNK_SIZE = 4096
+
+
+# the relation families computed root paradigm by root paradigm, and their number of relation types
+ROOT_RELATIONS_FAMILIES = (('contains', 1), ('father', 3), ('siblings', 4))
+
+# state of the worker processes of RelationsGraph._compute_relations
+_relations_worker = {}
+
+
+def _init_relations_worker(dictionary):
+    _relations_worker['dictionary'] = dictionary
+    # the father cache of the worker, shared only by the root paradigms computed in this process
+    _relations_worker['father_cache'] = {}
+
+
+def _compute_root_relations_worker(root):
+    return RelationsGraph._compute_root_relations(_relations_worker['dictionary'], root,
+                                                  _relations_worker['father_cache'])
+
+
 class RelationsGraph:
-    def __init__(self, dictionary):
+    def __init__(self, dictionary, workers=None, timing_hook=None):
         super().__init__()
 
         # dictionary = dictionary
-        self.relations = self._compute_relations(dictionary)
+        self.relations = self._compute_relations(dictionary, workers=workers, timing_hook=timing_hook)
 
         self.matrix = np.matrix(sum(self.relations.values()).todense())
 
@@ -23,32 +54,268 @@ class RelationsGraph:
         self.index = dictionary.index
 
     def object(self, subject, relation):
-        return self.scripts[sorted(self.relations[relation][self.index[subject]].indices)]
+        # the csr indices are sorted, the scripts are sorted by index
+        return self.scripts[self.relations[relation][self.index[subject]].indices]
 
     def relation_object(self, subject):
         return {relation: self.object(subject, relation) for relation in RELATIONS}
 
     def relation(self, subject, object):
-        return [relation for relation in RELATIONS if object in self.object(subject, relation)]
+        if object not in self.index:
+            return []
+
+        i, j = self.index[subject], self.index[object]
+        return [relation for relation in RELATIONS if self.relations[relation][i, j]]
+
+    def objects(self, subjects, relations=None, edges=False):
+        """
+        Batched version of RelationsGraph.object.
+
+        :param subjects: an iterable of scripts
+        :param relations: a relation type or a list of relation types, all the RELATIONS if None
+        :param edges: if True, return the edge list instead of the matrix
+        :return: if edges is False, a csr_matrix (len(subjects), len(dictionary)) of boolean, m[i, j] == True if there
+        is a relation of one of the relation types subjects[i] -> script(j).
+        if edges is True, a tuple of three np.array (subject index, object index, relation type index in RELATIONS),
+        ordered by subject, relation type and object.
+        """
+        subjects_idx = self._indices(subjects)
+        relations = self._relations_types(relations)
+
+        if not edges:
+            return csr_matrix(self._adjacency(relations)[subjects_idx], dtype=bool)
+
+        rows, object, relation = [np.array([], dtype=int)], [np.array([], dtype=int)], [np.array([], dtype=int)]
+        for r in relations:
+            m = self.relations[r][subjects_idx].tocoo()
+            rows.append(m.row)
+            object.append(m.col)
+            relation.append(np.full(m.nnz, RELATIONS.index(r), dtype=int))
+
+        # the rows of each relation are sorted, a stable sort keeps the relation and object order for each subject
+        rows = np.concatenate(rows)
+        order = np.argsort(rows, kind='stable')
+        return subjects_idx[rows[order]], np.concatenate(object)[order], np.concatenate(relation)[order]
+
+    def neighbours(self, subjects, k=1, relations=None):
+        """
+        The scripts reachable from subjects in at most k hops.
+
+        :param subjects: an iterable of scripts
+        :param k: the maximum number of hops
+        :param relations: the relation types to follow, all the RELATIONS if None
+        :return: a np.array of the scripts at distance 1 to k from the subjects, sorted
+        """
+        adjacency = self._adjacency(self._relations_types(relations))
+
+        visited = np.zeros(len(self.scripts), dtype=bool)
+        visited[self._indices(subjects)] = True
+        frontier = csr_matrix(visited, dtype=np.int32)
+
+        for _ in range(k):
+            reached = np.zeros(len(self.scripts), dtype=bool)
+            reached[frontier.dot(adjacency).indices] = True
+            reached &= ~visited
+            if not reached.any():
+                break
+
+            visited |= reached
+            frontier = csr_matrix(reached, dtype=np.int32)
 
+        visited[self._indices(subjects)] = False
+        return self.scripts[np.flatnonzero(visited)]
+
+    def shortest_path(self, subject, object, relations=None):
+        """
+        A shortest path subject -> object that only follows the given relation types.
+
+        :param subject: the starting script
+        :param object: the target script
+        :param relations: the relation types to follow, all the RELATIONS if None
+        :return: a list of (script, relation type, script) steps, or None if object is not reachable
+        """
+        relations = self._relations_types(relations)
+        i, j = self.index[subject], self.index[object]
+
+        _, predecessors = breadth_first_order(self._adjacency(relations), i, directed=True,
+                                              return_predecessors=True)
+        if i != j and predecessors[j] < 0:
+            return None
+
+        path = []
+        while j != i:
+            p = predecessors[j]
+            relation = next(r for r in relations if self.relations[r][p, j])
+            path.append((self.scripts[p], relation, self.scripts[j]))
+            j = p
+
+        return path[::-1]
+
+    def count(self, subjects=None, relations=None):
+        """
+        The number of objects for each subject and each relation type.
+
+        :param subjects: an iterable of scripts, all the scripts of the dictionary if None
+        :param relations: a list of relation types, all the RELATIONS if None
+        :return: a np.array (len(subjects), len(relations)) of int
+        """
+        relations = self._relations_types(relations)
+        subjects_idx = np.arange(len(self.scripts)) if subjects is None else self._indices(subjects)
+
+        return np.stack([np.diff(self.relations[r].indptr)[subjects_idx] for r in relations], axis=1) \
+            if relations else np.zeros((len(subjects_idx), 0), dtype=int)
+
+    def _indices(self, scripts):
+        return np.array([self.index[s] for s in scripts], dtype=int)
+
+    @staticmethod
+    def _relations_types(relations):
+        if relations is None:
+            return list(RELATIONS)
+
+        if isinstance(relations, str):
+            relations = [relations]
+
+        missing = [r for r in relations if r not in RELATIONS]
+        if missing:
+            raise ValueError("Invalid relations : {%s}" % ", ".join(missing))
+
+        return list(relations)
+
+    def _adjacency(self, relations):
+        if not relations:
+            return csr_matrix((len(self.scripts), len(self.scripts)), dtype=bool)
+
+        return csr_matrix(sum(self.relations[r] for r in relations), dtype=bool)
 
     def pandas(self):
-        subjects = []
-        relations = []
-        objects = []
-        for s in self.scripts:
-            for r in RELATIONS:
-                for o in self.object(s, r):
-                    subjects.append(str(s))
-                    relations.append(r)
-                    objects.append(str(o))
+        """
+        The relations edge list with the scripts as strings.
 
+        :return: a pandas.DataFrame with the columns substance (the subject), attribute (the object) and mode (the
+        relation type)
+        """
+        edges = self.edges(scripts=True)
         return pandas.DataFrame({
-            'substance': subjects,
-            'attribute': objects,
-            'mode': relations
+            'substance': edges['subject_script'],
+            'attribute': edges['object_script'],
+            'mode': edges['relation_type']
         })
 
+    def iter_edges(self, relations=None, chunk_size=EDGES_CHUNK_SIZE):
+        """
+        Iterate over the edge list, read from the csr arrays by blocks of subjects.
+
+        :param relations: a relation type or a list of relation types, all the RELATIONS if None
+        :param chunk_size: the number of subjects of each block
+        :return: an iterator of tuples of three np.array (subject index, object index, relation type index in
+        RELATIONS), ordered by subject, relation type and object.
+        """
+        relations = self._relations_types(relations)
+        matrices = [(self.relations[r], RELATIONS.index(r)) for r in relations]
+
+        for start in range(0, len(self.scripts), chunk_size):
+            stop = min(start + chunk_size, len(self.scripts))
+
+            rows, object, relation = [np.array([], dtype=np.int32)], [np.array([], dtype=np.int32)], \
+                                     [np.array([], dtype=np.int8)]
+            for m, r in matrices:
+                counts = np.diff(m.indptr[start:stop + 1])
+                rows.append(np.repeat(np.arange(start, stop, dtype=np.int32), counts))
+                object.append(m.indices[m.indptr[start]:m.indptr[stop]].astype(np.int32))
+                relation.append(np.full(counts.sum(), r, dtype=np.int8))
+
+            # the rows of each relation are sorted, a stable sort keeps the relation and object order for each subject
+            rows = np.concatenate(rows)
+            order = np.argsort(rows, kind='stable')
+            yield rows[order], np.concatenate(object)[order], np.concatenate(relation)[order]
+
+    def edges(self, relations=None, scripts=False):
+        """
+        The edge list of the relations.
+
+        :param relations: a relation type or a list of relation types, all the RELATIONS if None
+        :param scripts: if True, add the subject_script, object_script and relation_type columns of strings
+        :return: a pandas.DataFrame with the columns subject, object and relation (the index of the relation type
+        in RELATIONS), ordered by subject, relation type and object.
+        """
+        frames = [self._edges_frame(*chunk, scripts=scripts) for chunk in self.iter_edges(relations)]
+        if not frames:
+            # no scripts, an empty edge list with the same columns and types
+            frames = [self._edges_frame(np.array([], dtype=np.int32), np.array([], dtype=np.int32),
+                                        np.array([], dtype=np.int8), scripts=scripts)]
+
+        return pandas.concat(frames, ignore_index=True)
+
+    def export(self, path, relations=None, scripts=False, chunk_size=EDGES_CHUNK_SIZE):
+        """
+        Write the edge list to a .csv or a .npz file, block of subjects by block of subjects.
+
+        The .npz file contains the subject, object and relation arrays, and if scripts is True, the scripts array of
+        the scripts strings (indexed by subject and object) and the relations array of the relation types strings
+        (indexed by relation).
+
+        :param path: the path of the file, ending by .csv or .npz
+        :param relations: a relation type or a list of relation types, all the RELATIONS if None
+        :param scripts: if True, also export the scripts and relation types strings
+        :param chunk_size: the number of subjects of each block
+        :return: the number of edges written
+        """
+        if path.endswith('.csv'):
+            total = 0
+            for i, chunk in enumerate(self.iter_edges(relations, chunk_size=chunk_size)):
+                self._edges_frame(*chunk, scripts=scripts).to_csv(path, mode='w' if i == 0 else 'a',
+                                                                  header=i == 0, index=False)
+                total += len(chunk[0])
+            return total
+
+        if path.endswith('.npz'):
+            relations = self._relations_types(relations)
+            total = int(sum(self.relations[r].nnz for r in relations))
+
+            with zipfile.ZipFile(path, mode='w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as file:
+                # one array at a time, written chunk by chunk after its header
+                for column, dtype in enumerate((np.int32, np.int32, np.int8)):
+                    name = ('subject', 'object', 'relation')[column]
+                    with file.open(name + '.npy', mode='w', force_zip64=True) as fp:
+                        np.lib.format.write_array_header_2_0(fp, {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                                                  'fortran_order': False,
+                                                                  'shape': (total,)})
+                        for chunk in self.iter_edges(relations, chunk_size=chunk_size):
+                            fp.write(chunk[column].tobytes())
+
+                if scripts:
+                    for name, array in [('scripts', self.scripts_str.astype(str)),
+                                        ('relations', np.array(RELATIONS))]:
+                        with file.open(name + '.npy', mode='w', force_zip64=True) as fp:
+                            np.lib.format.write_array(fp, array, allow_pickle=False)
+            return total
+
+        raise ValueError("Invalid export file {}, expected a .csv or a .npz file".format(path))
+
+    @property
+    def scripts_str(self):
+        """
+        :return: a np.array of the scripts strings, indexed like the scripts
+        """
+        if getattr(self, '_scripts_str', None) is None:
+            self._scripts_str = np.array([str(s) for s in self.scripts], dtype=object)
+        return self._scripts_str
+
+    def _edges_frame(self, subjects, objects, relations, scripts=False):
+        frame = pandas.DataFrame({
+            'subject': subjects,
+            'object': objects,
+            'relation': relations
+        })
+
+        if scripts:
+            frame['subject_script'] = self.scripts_str[subjects]
+            frame['object_script'] = self.scripts_str[objects]
+            frame['relation_type'] = np.array(RELATIONS, dtype=object)[relations]
+
+        return frame
+
     @property
     def boolean_matrix(self):
         """
@@ -58,24 +325,69 @@ class RelationsGraph:
         return np.matrix(self.matrix, dtype=bool)
 
     @staticmethod
-    def _compute_relations(dictionary):
-        # print("Computing relations", file=sys.stderr)
-        # logger.log(logging.DEBUG, "Computing tables relations")
-        # logger.log(logging.DEBUG, "Computing contains/contained relations")
-        # logger.log(logging.DEBUG, "Computing father/child relations")
-        # print("Computing siblings relations", sys.stderr)
+    def _compute_relations(dictionary, workers=None, timing_hook=None):
+        """
+        Compute the relations matrices of the dictionary. The contains, father and siblings relation families are
+        independent for each root paradigm, they are computed root by root (in a process pool of `workers`
+        processes if workers > 1) and their COO triplets are concatenated at the end, a family without triplets (no
+        root paradigm) is empty.
+
+        The fathers of the sub-scripts are cached and reused between the root paradigms. With workers > 1, each
+        process has its own cache, filled by the roots it computes: a sub-script shared by the roots of different
+        processes is resolved once in each of them. The cache is an optimization only, the relations are the same.
+
+        :param dictionary: the dictionary
+        :param workers: the number of processes to use, computed in this process if None or 1
+        :param timing_hook: a callable (family, seconds), called with the computation time of each relation family
+        :return: a dict relation type -> csr_matrix
+        """
+        roots = list(dictionary.tables.roots)
+
+        if workers is not None and workers > 1 and len(roots) > 1:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_relations_worker,
+                                     initargs=(dictionary,)) as executor:
+                roots_relations = list(executor.map(_compute_root_relations_worker, roots))
+        else:
+            father_cache = {}
+            roots_relations = [RelationsGraph._compute_root_relations(dictionary, root, father_cache)
+                               for root in roots]
+
+        timings = defaultdict(float)
+
+        # concatenate the COO triplets of the root paradigms
+        triplets = {family: [([], []) for _ in range(size)] for family, size in ROOT_RELATIONS_FAMILIES}
+        for root, root_relations in zip(roots, roots_relations):
+            for family, (family_triplets, elapsed) in root_relations.items():
+                timings[family] += elapsed
+
+                if len(family_triplets) != len(triplets[family]):
+                    raise ValueError("Invalid {} relations of the root {}: expected {} relation types, got {}"
+                                     .format(family, str(root), len(triplets[family]), len(family_triplets)))
+
+                for (i, j), (i_root, j_root) in zip(triplets[family], family_triplets):
+                    i.extend(i_root)
+                    j.extend(j_root)
+
+        shape = [len(dictionary)] * 2
+        def _to_matrices(family):
+            return [coo_matrix(([True] * len(i), (i, j)), shape=shape, dtype=bool) for i, j in triplets[family]]
 
         relations = {}
-        contains = RelationsGraph._compute_contains(dictionary)
+
+        # contain/contained, every script contains itself
+        contains_i, contains_j = triplets['contains'][0]
+        contains_i.extend(range(len(dictionary)))
+        contains_j.extend(range(len(dictionary)))
+        contains, = _to_matrices('contains')
         relations['contains'] = csr_matrix(contains)
         relations['contained'] = csr_matrix(relations['contains'].transpose())
 
-        father = RelationsGraph._compute_father(dictionary)
-
+        father = _to_matrices('father')
         for i, r in enumerate(['_substance', '_attribute', '_mode']):
             relations['father' + r] = dok_matrix(father[i])
 
-        siblings = RelationsGraph._compute_siblings(dictionary)
+        siblings = _to_matrices('siblings')
         relations['opposed'] = dok_matrix(siblings[0])
         relations['associated'] = dok_matrix(siblings[1])
         relations['crossed'] = dok_matrix(siblings[2])
@@ -96,98 +408,112 @@ class RelationsGraph:
         #                           self.relations['child_mode']
         # self.relations['etymology'] = self.relations['father'] + self.relations['child']
 
+        before = time()
         table = RelationsGraph._compute_table_rank(dictionary, relations['contained'])
         for i in range(6):
             relations['table_%d'%i] = table[i]
+        timings['table'] += time() - before
 
-        relations['identity'] = csr_matrix(np.eye(len(dictionary)))
+        relations['identity'] = identity(len(dictionary), format='csr')
 
         missing = {s for s in RELATIONS if s not in relations}
         if missing:
             raise ValueError("Missing relations : {%s}"%", ".join(missing))
 
-        return {reltype: csr_matrix(relations[reltype]) for reltype in RELATIONS}
+        relations = {reltype: csr_matrix(relations[reltype]) for reltype in RELATIONS}
+        for m in relations.values():
+            m.sort_indices()
 
-    @staticmethod
-    def _compute_table_rank(dictionary, contained):
+        if timing_hook is not None:
+            for family, elapsed in timings.items():
+                timing_hook(family, elapsed)
 
-        tables_rank = [([], []) for _ in range(6)]
+        return relations
 
-        indices = [
-            set(l) for l in np.split(contained.indices, contained.indptr)[1:-1]
-        ]
+    @staticmethod
+    def _compute_root_relations(dictionary, root, father_cache):
+        """
+        Compute the contains, father and siblings relation families of the scripts of a root paradigm.
 
-        for root in dictionary.tables.roots:
+        :return: a dict family -> (list of (subjects indexes, objects indexes), computation time in seconds)
+        """
+        res = {}
+        for family, compute in [('contains', RelationsGraph._compute_contains),
+                                ('father', partial(RelationsGraph._compute_father, father_cache=father_cache)),
+                                ('siblings', RelationsGraph._compute_siblings)]:
+            before = time()
+            triplets = compute(dictionary, root)
+            res[family] = (triplets, time() - before)
 
-            for t0, t1 in combinations(dictionary.tables.roots[root], 2):
-                i0 = dictionary.index[t0.script]
-                i1 = dictionary.index[t1.script]
+        return res
 
-                commons = [dictionary.scripts[i] for i in indices[i0] & indices[i1]]
-                ranks = set(map(lambda t: dictionary.tables.tables[t].rank, commons))
-                for rank in ranks:
-                    tables_rank[rank][0].extend((i0, i1))
-                    tables_rank[rank][1].extend((i1, i0))
+    @staticmethod
+    def _compute_table_rank(dictionary, contained):
+        # rank of each script of the dictionary (the cells are of rank 6)
+        ranks = np.array([dictionary.tables.tables[s].rank for s in dictionary.scripts], dtype=int)
 
-        for t in dictionary.scripts:
-            idx = dictionary.index[t]
+        # contained restricted to the tables : contained[i, k] if the k-th table contains the script i
+        tables_idx = np.flatnonzero(ranks != 6)
+        contained = csc_matrix(contained, dtype=np.int32)[:, tables_idx]
 
-            try:
-                ranks = {dictionary.tables.tables[dictionary.scripts[i]].rank for i in indices[idx]} - {6}
-            except KeyError:
-                print(t)
+        # rank_indicator[k, r] if the k-th table is of rank r
+        rank_indicator = csc_matrix((np.ones(len(tables_idx), dtype=np.int32),
+                                     (np.arange(len(tables_idx)), ranks[tables_idx])),
+                                    shape=(len(tables_idx), 6))
 
-            for rank in ranks:
-                tables_rank[rank][0].append(idx)
-                tables_rank[rank][1].append(idx)
+        tables_rank = []
+        for rank in range(6):
+            # m[i, j] > 0 if a table of this rank contains both i and j (on the diagonal, a table of this rank
+            # contains i)
+            m = contained.dot(diags(rank_indicator[:, rank].toarray().ravel())).dot(contained.transpose())
+            tables_rank.append(csr_matrix(m, dtype=bool))
 
-        shape = [len(dictionary)] * 2
-        return [coo_matrix(([True]*len(i), (i, j)), shape=shape, dtype=np.bool) for i, j in tables_rank]
+        return tables_rank
 
     @staticmethod
-    def _compute_contains(dictionary):
+    def _compute_contains(dictionary, root):
         # contain/contained
-        shape = [len(dictionary)] * 2
+        i = []
+        j = []
 
-        i = list(range(shape[0]))
-        j = list(range(shape[1]))
+        paradigms = {t for t in dictionary.tables.roots[root] if t.script.paradigm}
 
-        for r_p, v in dictionary.tables.roots.items():
-            paradigms = {t for t in v if t.script.paradigm}
+        for p in paradigms:
+            _contains = [dictionary.index[ss] for ss in p.script.singular_sequences] + \
+                        [dictionary.index[k.script] for k in paradigms if k.script in p.script]
+            i.extend(repeat(dictionary.index[p.script], len(_contains)))
+            j.extend(_contains)
 
-            for p in paradigms:
-                _contains = [dictionary.index[ss] for ss in p.script.singular_sequences] + \
-                            [dictionary.index[k.script] for k in paradigms if k.script in p.script]
-                i.extend(repeat(dictionary.index[p.script], len(_contains)))
-                j.extend(_contains)
-
-        return coo_matrix(([True] * len(i), (i, j)), shape=shape, dtype=np.bool)
+        return [(i, j)]
 
     @staticmethod
-    def _compute_father(dictionary):
-
-        shape = [len(dictionary)] * 2
-        scripts = set(dictionary.scripts)
-
+    def _compute_father(dictionary, root, father_cache):
+        """father_cache is a dict sub-script -> fathers indexes, shared between the root paradigms computed in the
+        same process"""
         def _recurse_script(script):
+            if script in father_cache:
+                return father_cache[script]
+
             result = []
             for sub_s in script.children if isinstance(script, AdditiveScript) else [script]:
                 if isinstance(sub_s, NullScript):
                     continue
 
-                if sub_s in scripts:
+                if sub_s in dictionary.index:
                     result.append(dictionary.index[sub_s])
                 else:
                     if sub_s.layer > 0:
                         result.extend(chain.from_iterable(_recurse_script(c) for c in sub_s.children))
 
+            father_cache[script] = result
             return result
 
         # father = coo_matrix((3, len(dictionary), len(dictionary)), dtype=np.bool)
 
         father = [([], []) for _ in range(3)]
 
-        for s in dictionary.scripts:
+        for t in dictionary.tables.roots[root]:
+            s = t.script
             for sub_s in s if isinstance(s, AdditiveScript) else [s]:
                 if len(sub_s.children) == 0 or isinstance(sub_s, NullScript):
                     continue
@@ -200,10 +526,10 @@ class RelationsGraph:
                     father[i][0].extend(repeat(dictionary.index[s], len(fathers_indexes)))
                     father[i][1].extend(fathers_indexes)
 
-        return [coo_matrix(([True] * len(i), (i, j)), shape=shape, dtype=np.bool) for i, j in father]
+        return father
 
     @staticmethod
-    def _compute_siblings(dictionary):
+    def _compute_siblings(dictionary, root):
         # siblings
         # 1 dim => the sibling type
         #  -0 opposed
@@ -229,50 +555,48 @@ class RelationsGraph:
 
         siblings = [([], []) for _ in range(4)]
 
-        for root in dictionary.tables.roots:
-            _inhib_opposed = 'opposed' not in dictionary._inhibitions[root]
-            _inhib_associated = 'associated' not in dictionary._inhibitions[root]
-            _inhib_crossed = 'crossed' not in dictionary._inhibitions[root]
-            _inhib_twin = 'twin' not in dictionary._inhibitions[root]
+        _inhib_opposed = 'opposed' not in dictionary._inhibitions[root]
+        _inhib_associated = 'associated' not in dictionary._inhibitions[root]
+        _inhib_crossed = 'crossed' not in dictionary._inhibitions[root]
+        _inhib_twin = 'twin' not in dictionary._inhibitions[root]
 
-            if root.layer == 0:
-                continue
-            _twins = []
+        if root.layer == 0:
+            return siblings
+        _twins = []
 
-            for i, t0 in enumerate(dictionary.tables.roots[root]):
-                if not isinstance(t0.script, MultiplicativeScript):
-                    continue
+        for i, t0 in enumerate(dictionary.tables.roots[root]):
+            if not isinstance(t0.script, MultiplicativeScript):
+                continue
 
-                if t0.script.children[0] == t0.script.children[1]:
-                    _twins.append(t0)
+            if t0.script.children[0] == t0.script.children[1]:
+                _twins.append(t0)
 
-                for t1 in [t for j, t in enumerate(dictionary.tables.roots[root])
-                           if j > i and isinstance(t.script, MultiplicativeScript)]:
+            for t1 in [t for j, t in enumerate(dictionary.tables.roots[root])
+                       if j > i and isinstance(t.script, MultiplicativeScript)]:
 
-                    i0 = dictionary.index[t0.script]
-                    i1 = dictionary.index[t1.script]
+                i0 = dictionary.index[t0.script]
+                i1 = dictionary.index[t1.script]
 
-                    if _inhib_opposed and _opposed_sibling(t0.script, t1.script):
-                        siblings[0][0].extend((i0, i1))
-                        siblings[0][1].extend((i1, i0))
+                if _inhib_opposed and _opposed_sibling(t0.script, t1.script):
+                    siblings[0][0].extend((i0, i1))
+                    siblings[0][1].extend((i1, i0))
 
-                    if _inhib_associated and _associated_sibling(t0.script, t1.script):
-                        siblings[1][0].extend((i0, i1))
-                        siblings[1][1].extend((i1, i0))
+                if _inhib_associated and _associated_sibling(t0.script, t1.script):
+                    siblings[1][0].extend((i0, i1))
+                    siblings[1][1].extend((i1, i0))
 
-                    if _inhib_crossed and _crossed_sibling(t0.script, t1.script):
-                        siblings[2][0].extend((i0, i1))
-                        siblings[2][1].extend((i1, i0))
+                if _inhib_crossed and _crossed_sibling(t0.script, t1.script):
+                    siblings[2][0].extend((i0, i1))
+                    siblings[2][1].extend((i1, i0))
 
-            if _inhib_twin:
-                _twins = sorted(_twins, key=lambda t: t.script.cardinal)
-                for card, g in groupby(_twins, key=lambda t: t.script.cardinal):
-                    twin_indexes = [dictionary.index[t.script] for t in g]
+        if _inhib_twin:
+            _twins = sorted(_twins, key=lambda t: t.script.cardinal)
+            for card, g in groupby(_twins, key=lambda t: t.script.cardinal):
+                twin_indexes = [dictionary.index[t.script] for t in g]
 
-                    if len(twin_indexes) > 1:
-                        index0, index1 = list(zip(*permutations(twin_indexes, r=2)))
-                        siblings[3][0].extend(index0)
-                        siblings[3][1].extend(index1)
+                if len(twin_indexes) > 1:
+                    index0, index1 = list(zip(*permutations(twin_indexes, r=2)))
+                    siblings[3][0].extend(index0)
+                    siblings[3][1].extend(index1)
 
-        shape = [len(dictionary)] * 2
-        return [coo_matrix(([True]*len(i), (i, j)), shape=shape, dtype=np.bool) for i, j in siblings]
+        return siblings
@@ -1,4 +1,6 @@
 import itertools
+import random
+
 import numpy as np
 
 from ieml.exceptions import InvalidScriptCharacter, InvalidScript, IncompatiblesScriptsLayers, TooManySingularSequences
@@ -6,14 +8,22 @@ from ieml.commons import TreeStructure, DecoratedComponent
 from ieml.constants import MAX_LAYER, MAX_SINGULAR_SEQUENCES, MAX_SIZE_HEADER, LAYER_MARKS, PRIMITIVES, \
     remarkable_multiplication_lookup_table, REMARKABLE_ADDITION, character_value, AUXILIARY_CLASS, VERB_CLASS, \
     NOUN_CLASS
+from collections import namedtuple
 from itertools import chain
 
 
+# The contained paradigms of a script, only built on demand
+ScriptTables = namedtuple('ScriptTables', ['cells', 'tables_script', 'headers'])
+
 
 class Script(TreeStructure, DecoratedComponent):
     """ A parser is defined by a character (PRIMITIVES, REMARKABLE_ADDITION OR REMARKABLE_MULTIPLICATION)
      or a list of parser children. All the element in the children list must be an AdditiveScript or
      a MultiplicativeScript."""
+    __slots__ = ('character', 'layer', 'is_paradigm', 'paradigm', 'empty', 'cardinal',
+                 '_singular_sequences', '_singular_sequences_set', '_tables', 'canonical', 'script_class',
+                 'grammatical_class')
+
     def __init__(self, children=None, character=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -43,11 +53,8 @@ class Script(TreeStructure, DecoratedComponent):
         self._singular_sequences = None
         self._singular_sequences_set = None
 
-        # The contained paradigms (tables)
+        # The contained paradigms (tables), a ScriptTables allocated by _build_tables
         self._tables = None
-        self._cells = None
-        self._tables_script = None
-        self._headers = None
 
         # The canonical string to compare same layer and cardinal parser (__lt__)
         self.canonical = None
@@ -167,30 +174,25 @@ class Script(TreeStructure, DecoratedComponent):
 
     def _build_tables(self):
         if self.cardinal == 1:
-            self._cells = (np.array([[[self]]]),)
-            self._tables_script = (self,)
-            self._headers = ()
+            self._tables = ScriptTables(cells=(np.array([[[self]]]),), tables_script=(self,), headers=())
         else:
             _cells, _tables_script, _headers = self._compute_cells()
-            self._cells, self._tables_script, self._headers = tuple(_cells), tuple(_tables_script), tuple(_headers)
+            self._tables = ScriptTables(cells=tuple(_cells), tables_script=tuple(_tables_script),
+                                        headers=tuple(_headers))
+
+        return self._tables
 
     @property
     def cells(self):
-        if self._cells is None:
-            self._build_tables()
-        return self._cells
+        return (self._tables or self._build_tables()).cells
 
     @property
     def headers(self):
-        if self._headers is None:
-            self._build_tables()
-        return self._headers
+        return (self._tables or self._build_tables()).headers
 
     @property
     def tables_script(self):
-        if self._tables_script is None:
-            self._build_tables()
-        return self._tables_script
+        return (self._tables or self._build_tables()).tables_script
 
 
     @property
@@ -211,6 +213,23 @@ class Script(TreeStructure, DecoratedComponent):
     def is_singular(self):
         return self.cardinal == 1
 
+    def sample(self, k, seed=None):
+        """
+        Draw k distinct singular sequences uniformly, without computing all the singular sequences.
+
+        :param k: the number of singular sequences to draw
+        :param seed: the seed of the random generator, the sample is reproducible for a given seed
+        :return: a list of k singular sequences
+        """
+        return [self._singular_sequence_at(i) for i in random.Random(seed).sample(range(self.cardinal), k)]
+
+    def _singular_sequence_at(self, i):
+        """
+        The singular sequence of index i in the mixed radix numbering of the children singular sequences (this is not
+        the index in the sorted singular_sequences).
+        """
+        return self
+
     def iter_structure(self):
         return []
 
@@ -232,6 +251,8 @@ class Script(TreeStructure, DecoratedComponent):
 
 class AdditiveScript(Script):
     """ Represent an addition of same layer scripts."""
+    __slots__ = ()
+
     def __init__(self, children=None, character=None):
         _character = None
         _children = []
@@ -325,6 +346,17 @@ class AdditiveScript(Script):
             s.sort()
             return s
 
+    def _singular_sequence_at(self, i):
+        if not self.paradigm:
+            return self
+
+        for child in self.children:
+            if i < child.cardinal:
+                return child._singular_sequence_at(i)
+            i -= child.cardinal
+
+        raise IndexError("Singular sequence index out of range")
+
     def _compute_cells(self):
         # we generate one table per children, unless one children is a singular sequence.
         # if so, we generate one column instead
@@ -344,6 +376,8 @@ class AdditiveScript(Script):
 
 class MultiplicativeScript(Script):
     """ Represent a multiplication of three scripts of the same layer."""
+    __slots__ = ()
+
     def __init__(self, substance=None, attribute=None, mode=None, children=None, character=None):
         if not (substance or children or character):
             raise InvalidScript()
@@ -486,6 +520,18 @@ class MultiplicativeScript(Script):
             s.sort()
             return s
 
+    def _singular_sequence_at(self, i):
+        if not self.paradigm:
+            return self
+
+        # the last child varies the fastest
+        children = []
+        for child in reversed(self.children):
+            i, r = divmod(i, child.cardinal)
+            children.append(child._singular_sequence_at(r))
+
+        return MultiplicativeScript(children=children[::-1])
+
     def _compute_cells(self):
         # check how many plurals child
         plurals_child = [(c, i) for i, c in enumerate(self.children) if c.cardinal != 1]
@@ -548,6 +594,8 @@ class MultiplicativeScript(Script):
 
 
 class NullScript(Script):
+    __slots__ = ()
+
     def __init__(self, layer):
         super().__init__(children=[])
         self.layer = layer
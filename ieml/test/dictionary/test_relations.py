@@ -1,8 +1,15 @@
+import os
+import tempfile
 from itertools import product
 from unittest.case import TestCase
 
+import numpy as np
+import pandas
+
 from ieml.constants import RELATIONS, INVERSE_RELATIONS
+from ieml.dictionary.dictionary import Dictionary
 from ieml.dictionary.script import script
+from ieml.ieml_database.ieml_database import Structure
 from ieml.test.dictionary.dictionary_testcase import DictionaryTestCase
 
 
@@ -62,3 +69,93 @@ class TestRelations(DictionaryTestCase):
                 self.assertTrue(self.dictionary.relations.relation(t0, t1))
 
 
+
+    def test_objects(self):
+        subjects = [script('wa.'), script("M:M:.u.-"), script("s.u.-")]
+        m = self.dictionary.relations.objects(subjects, ['contains', 'opposed'])
+        self.assertEqual(m.shape, (len(subjects), len(self.dictionary)))
+
+        for i, s in enumerate(subjects):
+            objects = set(self.dictionary.relations.object(s, 'contains')) | \
+                      set(self.dictionary.relations.object(s, 'opposed'))
+            self.assertSetEqual(set(self.dictionary.scripts[m[i].indices]), objects)
+
+        for s, o, r in zip(*self.dictionary.relations.objects(subjects, edges=True)):
+            self.assertIn(self.dictionary.scripts[o],
+                          self.dictionary.relations.object(self.dictionary.scripts[s], RELATIONS[r]))
+
+    def test_count(self):
+        subjects = [script('wa.'), script("M:M:.u.-")]
+        counts = self.dictionary.relations.count(subjects)
+        for i, s in enumerate(subjects):
+            for j, reltype in enumerate(RELATIONS):
+                self.assertEqual(counts[i, j], len(self.dictionary.relations.object(s, reltype)))
+
+    def test_neighbours(self):
+        t_ss = script("s.u.-")
+        self.assertSetEqual(set(self.dictionary.relations.neighbours([t_ss], k=1, relations='contained')),
+                            set(self.dictionary.relations.object(t_ss, 'contained')) - {t_ss})
+
+        self.assertNotIn(t_ss, self.dictionary.relations.neighbours([t_ss], k=2))
+
+    def test_shortest_path(self):
+        t_p = script("M:M:.u.-")
+        t_ss = script("s.u.-")
+
+        self.assertListEqual(self.dictionary.relations.shortest_path(t_ss, t_ss), [])
+        self.assertListEqual(self.dictionary.relations.shortest_path(t_ss, t_p, relations=['contained']),
+                             [(t_ss, 'contained', t_p)])
+
+        for s, reltype, o in self.dictionary.relations.shortest_path(t_ss, script("t.u.-"),
+                                                                       relations=['contains', 'contained']):
+            self.assertIn(o, self.dictionary.relations.object(s, reltype))
+
+    def test_edges(self):
+        edges = self.dictionary.relations.edges(relations=['contains', 'twin'], scripts=True)
+        self.assertEqual(len(edges), sum(self.dictionary.relations.relations[r].nnz for r in ['contains', 'twin']))
+
+        t = script("M:M:.u.-")
+        for o, reltype in edges[edges.subject_script == str(t)][['object_script', 'relation_type']].values:
+            self.assertIn(script(o), self.dictionary.relations.object(t, reltype))
+
+    def test_edges_empty(self):
+        for scripts, columns in [(False, ['subject', 'object', 'relation']),
+                                 (True, ['subject', 'object', 'relation', 'subject_script', 'object_script',
+                                         'relation_type'])]:
+            edges = self.dictionary.relations.edges(relations=[], scripts=scripts)
+            self.assertEqual(len(edges), 0)
+            self.assertListEqual(list(edges.columns), columns)
+
+    def test_pandas(self):
+        df = self.dictionary.relations.pandas()
+        self.assertListEqual(list(df.columns), ['substance', 'attribute', 'mode'])
+        self.assertEqual(len(df), sum(self.dictionary.relations.relations[r].nnz for r in RELATIONS))
+
+        t = script("M:M:.u.-")
+        for o, reltype in df[df.substance == str(t)][['attribute', 'mode']].values:
+            self.assertIn(script(o), self.dictionary.relations.object(t, reltype))
+
+    def test_export(self):
+        edges = self.dictionary.relations.edges(relations='contained')
+        with tempfile.TemporaryDirectory() as folder:
+            file = os.path.join(folder, 'edges.csv')
+            self.assertEqual(self.dictionary.relations.export(file, relations='contained', chunk_size=100), len(edges))
+            self.assertTrue((pandas.read_csv(file).values == edges.values).all())
+
+            file = os.path.join(folder, 'edges.npz')
+            self.assertEqual(self.dictionary.relations.export(file, relations='contained', chunk_size=100), len(edges))
+            npz = np.load(file)
+            for column in ['subject', 'object', 'relation']:
+                self.assertTrue((npz[column] == edges[column].values).all())
+
+            with self.assertRaises(ValueError):
+                self.dictionary.relations.export(os.path.join(folder, 'edges.txt'))
+
+
+class TestRelationsNoRoots(TestCase):
+    def test_no_roots(self):
+        dictionary = Dictionary([], Structure(pandas.DataFrame([], columns=['ieml', 'key', 'value'])))
+
+        for reltype in RELATIONS:
+            self.assertEqual(dictionary.relations.relations[reltype].nnz, 0)
+        self.assertEqual(len(dictionary.relations.edges()), 0)
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from ieml.exceptions import TooManySingularSequences
@@ -50,4 +51,27 @@ class TestScript(unittest.TestCase):
 
     def test_str(self):
         self.assertIsNotNone(MultiplicativeScript(character='A')._str)
-        self.assertIsNotNone(AdditiveScript(character='O')._str)
\ No newline at end of file
+        self.assertIsNotNone(AdditiveScript(character='O')._str)
+
+    def test_sample(self):
+        s = sc("O:M:.O:M:.-+M:O:.M:O:.-")
+        self.assertSetEqual({str(ss) for ss in s.sample(s.cardinal, seed=0)}, {str(ss) for ss in s.singular_sequences})
+
+        sample = s.sample(5, seed=42)
+        self.assertEqual(len(set(sample)), 5)
+        self.assertTrue(all(ss in s.singular_sequences_set for ss in sample))
+        self.assertListEqual(sample, s.sample(5, seed=42))
+
+        with self.assertRaises(ValueError):
+            s.sample(s.cardinal + 1)
+
+    def test_pickle(self):
+        s = sc("O:M:.M:M:.-")
+        self.assertEqual(len(s.tables_script), 1)
+
+        s1 = pickle.loads(pickle.dumps(s))
+        self.assertEqual(s1, s)
+        self.assertEqual(hash(s1), hash(s))
+        self.assertEqual(s1.cardinal, s.cardinal)
+        self.assertEqual(s1.cells[0].shape, s.cells[0].shape)
+        self.assertFalse(hasattr(s1, '__dict__'))
@@ -1,9 +1,10 @@
 import unittest
+from unittest import mock
 
 from ieml.usl import PolyMorpheme
-from ieml.usl.decoration.instance import InstancedUSL
+from ieml.usl.decoration.instance import InstancedUSL, Decoration
 from ieml.usl.decoration.parser.parser import PathParser
-from ieml.usl.decoration.path import RolePath, PolymorphemePath, LexemePath, FlexionPath
+from ieml.usl.decoration.path import RolePath, PolymorphemePath, LexemePath, FlexionPath, UslPath
 from ieml.usl.parser import IEMLParser
 from ieml.usl.usl import usl
 
@@ -66,6 +67,53 @@ class LiteralTestCase(unittest.TestCase):
         self.assertIsInstance(path, PolymorphemePath)
         self.assertEqual(res.decorations[0].path, path)
 
+    def test_overlay(self):
+        s = """[! E:A:.  ()(b.-S:.A:.-'S:.-'S:.-',) > E:A:. E:A:. ()(k.a.-k.a.-')] [>role>E:A:. E:A:.>content>constant>k.a.-k.a.-' "test"]"""
+        res = usl(s)
+        u = res.usl
+
+        p = PathParser().parse(">role>E:A:. E:A:.>content>constant>k.a.-k.a.-'")
+        self.assertEqual(res.get_value(p), 'test')
+        self.assertIsNone(res.get_value(PathParser().parse(">role>E:A:. E:A:.>content")))
+
+        # the usl is not decorated
+        self.assertEqual(str(u), str(usl(str(u))))
+
+        res2 = InstancedUSL(u, [Decoration(p, 'other')])
+        self.assertEqual(res.get_value(p), 'test')
+        self.assertEqual(res2.get_value(p), 'other')
+
+    def test_equal_lexemes(self):
+        # the two roles hold equal lexemes, shared by the interning, the decorations stay on their path
+        w = "[! E:A:.  (E:.-wa.-t.o.-')(k.a.-k.a.-') > E:A:. E:A:. (E:.-wa.-t.o.-')(k.a.-k.a.-')]"
+        for p in [">role>E:A:. E:A:.>content", ">role>E:A:. E:A:.>flexion>E:.-wa.-t.o.-'"]:
+            s = '{} [{} "test"]'.format(w, p)
+            res = usl(s)
+            self.assertEqual(len(res.decorations), 1)
+            self.assertEqual(str(res.decorations[0].path), p)
+            self.assertEqual(s, str(res))
+
+    def test_instanced_singular_sequences(self):
+        u = usl("[! E:A:.  ()(b.-S:.A:.-'S:.-'S:.-', m1(S: B: T:)) > E:A:. E:A:. (m1(E:U:T:. E:A:T:. E:S:T:.))(k.a.-k.a.-')]")
+        paths = [">role>! E:A:.>content>group_0 1>S:", ">role>E:A:. E:A:.>flexion>E:A:T:.",
+                 ">role>E:A:. E:A:.>content>constant>k.a.-k.a.-'"]
+        res = InstancedUSL(u, [Decoration(PathParser().parse(p), 'v%d' % i) for i, p in enumerate(paths)])
+
+        # the decorations are resolved once by lexeme of a role (4 by role), not once by singular sequence
+        with mock.patch.object(UslPath, 'contained', autospec=True, side_effect=UslPath.contained) as contained:
+            ss = res.singular_sequences
+            self.assertEqual(len(ss), u.cardinal)
+            self.assertEqual(len([str(s) for s in ss]), u.cardinal)
+        self.assertEqual(contained.call_count, 4 * 1 + 4 * 2)
+
+        for i, s in enumerate(ss):
+            # the decorations on the shared components are deferenced once, the result is the same as one by one
+            self.assertEqual(str(s), str(res._singular_sequence_at(i)))
+            self.assertEqual(str(s), str(InstancedUSL(s.usl, [d for d in res.decorations if d.path.contained(s.usl)])))
+
+        self.assertTrue(all('v2' in str(s) for s in ss))
+        self.assertEqual(sum(1 for s in ss if 'v1' in str(s)), u.cardinal // 4)
+
     def test_parse_flexion(self):
 
         p = "E:S:.-U:.-t.o.-' [>E:S:.-U:.-t.o.-' \"\"]"
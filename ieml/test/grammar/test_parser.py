@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from ieml.dictionary.script import Script
+from ieml.dictionary.script.parser import ScriptParser
+from ieml.exceptions import CannotParse
+from ieml.usl import PolyMorpheme, Lexeme, Word
+from ieml.usl.decoration.instance import InstancedUSL
+from ieml.usl.parser import IEMLParser, SinglePassParser, iter_parse_file
+from ieml.usl.usl import usl
+
+
+USLS = [
+    "S:",
+    "U: wo. wa.",
+    "o. m1(U: S:) m2(t. m.)",
+    "(U:)(S:)(B:)",
+    "()(S:)(B:)",
+    "()()(B:)",
+    "(U:)(S:)",
+    "()(S:)",
+    "(U:)",
+    "()",
+    "[! E:A:. (E:.wo.- E:S:.-d.u.-')(k.i.-l.i.-')]",
+    "[E:T:. (E:.b.wa.- E:.-wa.-t.o.-' E:.-'we.-S:.-'t.o.-',)(e.) > E:.n.- (E:.wo.- E:S:.-d.u.-') > E:.d.- (E:.wo.- E:S:.-d.u.-')(m.-S:.U:.-') > ! E:.n.- E:U:. ()]",
+    "[E:.b.E:S:.- ! E:A:. (E:.wo.- E:S:.-d.u.-')(k.i.-l.i.-')]",
+    """[! E:A:.  ()(b.-S:.A:.-'S:.-'S:.-',) > E:A:. E:A:. ()(k.a.-k.a.-')] [>role>E:A:. E:A:.>content>constant>k.a.-k.a.-' "test"]""",
+]
+
+INVALIDS = [
+    "U: wa. m1()",
+    "()()",
+    "(U:)()",
+    "(U:)(S:)()",
+    "(U:)(S:)(B:)(T:)",
+    "m1(U:) S:",
+    "[E:A:. (E:.wo.- E:S:.-d.u.-')(k.i.-l.i.-')]",
+    "[! E:A:. (E:.wo.- E:S:.-d.u.-')(k.i.-l.i.-')] S:",
+    "S: )",
+    "EO ] S:",
+]
+
+
+class SinglePassParserTest(unittest.TestCase):
+    def test_same_ast(self):
+        parser = SinglePassParser()
+        for s in USLS:
+            u = parser.parse(s)
+            self.assertEqual(type(u), type(IEMLParser().parse(s)))
+            self.assertEqual(str(u), str(IEMLParser().parse(s)))
+
+    def test_types(self):
+        parser = SinglePassParser()
+        self.assertIsInstance(parser.parse("S:"), Script)
+        self.assertIsInstance(parser.parse("S: B:"), PolyMorpheme)
+        self.assertIsInstance(parser.parse("(U:)(S:)(B:)"), Lexeme)
+        self.assertIsInstance(parser.parse(USLS[10]), Word)
+        self.assertIsInstance(parser.parse(USLS[13]), InstancedUSL)
+
+        # the nodes are the canonical ones
+        self.assertIs(parser.parse("U: wo. wa."), IEMLParser().parse("U: wo. wa."))
+
+    def test_morphemes_without_lock(self):
+        for s in USLS:
+            usl(s)
+
+        # the morphemes are found in the cache of the single pass parser, not in the cache of the ScriptParser
+        ScriptParser().t_parse.cache_clear()
+        with mock.patch.object(ScriptParser, 'lock') as lock:
+            res = [str(usl(s)) for s in USLS]
+
+        lock.__enter__.assert_not_called()
+        self.assertListEqual(res, [str(IEMLParser().parse(s)) for s in USLS])
+
+    def test_invalid(self):
+        parser = SinglePassParser()
+        for s in INVALIDS:
+            with self.assertRaises(CannotParse) as ctx:
+                IEMLParser().parse(s)
+            with self.assertRaises(CannotParse) as ctx_single_pass:
+                parser.parse(s)
+
+            # the same message, a syntax error is raised before the morphemes before it are built
+            self.assertEqual(str(ctx_single_pass.exception), str(ctx.exception))
+
+    def test_threads(self):
+        parser = SinglePassParser()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            res = list(executor.map(lambda s: str(parser.parse(s)), USLS * 10))
+
+        self.assertListEqual(res, [str(IEMLParser().parse(s)) for s in USLS * 10])
+
+
+class IterParseFileTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as fp:
+            for s in USLS + INVALIDS:
+                fp.write(s + '\n\n')
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_iter_parse_file(self):
+        res = list(iter_parse_file(self.path))
+        self.assertListEqual([line_no for line_no, _ in res], list(range(1, 2 * len(USLS + INVALIDS), 2)))
+        self.assertListEqual([str(u) for _, u in res[:len(USLS)]], [str(IEMLParser().parse(s)) for s in USLS])
+        for (_, e), s in zip(res[len(USLS):], INVALIDS):
+            self.assertIsInstance(e, CannotParse)
+            self.assertEqual(e.s, s)
+
+    def test_malformed_line(self):
+        # a lexeme without address is rejected by the syntagmatic function of the word
+        malformed = "[! E:T:. () > ()]"
+        with open(self.path, 'w') as fp:
+            fp.write('\n'.join([USLS[0], malformed, USLS[1]]))
+
+        for workers in [None, 2]:
+            res = list(iter_parse_file(self.path, workers=workers, chunk_size=1))
+            self.assertListEqual([line_no for line_no, _ in res], [1, 2, 3])
+            self.assertIsInstance(res[1][1], CannotParse)
+            self.assertEqual(res[1][1].s, malformed)
+            self.assertListEqual([str(res[0][1]), str(res[2][1])], [str(IEMLParser().parse(s)) for s in USLS[:2]])
+
+        for parser in [IEMLParser(), SinglePassParser()]:
+            with self.assertRaises(CannotParse):
+                parser.parse(malformed)
+
+    def test_unexpected_error(self):
+        # only the syntax and semantic errors of a line are returned, the other errors are raised
+        with mock.patch.object(SinglePassParser, 'parse', autospec=True, side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                list(iter_parse_file(self.path))
+
+    def test_workers(self):
+        res = [(line_no, str(u)) for line_no, u in iter_parse_file(self.path, check=True)]
+        self.assertListEqual([(line_no, str(u)) for line_no, u in iter_parse_file(self.path, workers=2, chunk_size=3,
+                                                                                  check=True)], res)
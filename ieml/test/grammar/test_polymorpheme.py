@@ -1,7 +1,9 @@
 import unittest
+from unittest import mock
 
 from ieml.exceptions import CannotParse
 from ieml.usl import PolyMorpheme, check_polymorpheme
+from ieml.usl.polymorpheme import compute_PM_singular_sequences
 from ieml.usl.parser import IEMLParser
 
 
@@ -26,6 +28,21 @@ class TestPolyMorpheme(unittest.TestCase):
                 assert ss not in elems
                 elems.add(ss)
 
+    def test_cardinal(self):
+        POLYMORPH = ["U: wo. wa.",
+                     "U: m2(wo. wa.)",
+                     "m1(U:) m1(S:)",
+                     "o. m1(U: S:) m2(t. m.)",
+                     "o. m2(A: S: B: T:) m2(y. t.)",
+                     "m3(A: S: B: T: U:) m2(y. t. o.) m1(wa. we.)"]
+        for _t in POLYMORPH:
+            t = IEMLParser().parse(_t)
+            self.assertEqual(t.cardinal, len(compute_PM_singular_sequences(t.constant, t.groups) or [t]))
+
+    def test_iter_singular_sequences(self):
+        t = IEMLParser().parse("o. m2(A: S: B: T:) m2(y. t.)")
+        self.assertListEqual([str(ss) for ss in t.iter_singular_sequences()],
+                             [str(ss) for ss in compute_PM_singular_sequences(t.constant, t.groups)])
 
     def test_invalid_cannot_parse_polymorpheme(self):
         POLYMORPH = [
@@ -50,3 +67,37 @@ class TestPolyMorpheme(unittest.TestCase):
 
             with self.assertRaises(ValueError):
                 check_polymorpheme(t)
+
+    def test_canonical_nodes(self):
+        t = IEMLParser().parse("o. m1(U: S:) m2(t. m.)")
+        self.assertIs(PolyMorpheme(constant=t.constant, groups=t.groups), t)
+        self.assertIs(PolyMorpheme(constant=list(reversed(t.constant)), groups=t.groups), t)
+
+        ss = t.singular_sequences
+        self.assertListEqual(sorted(ss), sorted(ss, key=lambda u: u.order_key))
+        for u0, u1 in zip(ss, ss[1:]):
+            self.assertEqual(u0 < u1, u0.order_key < u1.order_key)
+
+    def test_sort_key(self):
+        t = IEMLParser().parse("m3(A: S: B: T: U:) m2(y. t. o.) m1(wa. we.)")
+        ss = list(t.singular_sequences)
+
+        self.assertListEqual(sorted(ss, key=lambda u: u.sort_key), sorted(ss))
+        self.assertEqual(len({u.sort_key for u in ss}), len(ss))
+        for u0, u1 in zip(ss, ss[1:]):
+            self.assertEqual(u0 < u1, u0.sort_key < u1.sort_key)
+
+    def test_lazy_str(self):
+        t = IEMLParser().parse("m3(A: S: B: T: U:) m2(y. o. e. u. a. i.) m1(wa. we.)")
+
+        # the singular sequences can be shared with the other tests, the renders are counted instead of their strings
+        with mock.patch.object(PolyMorpheme, '_render', autospec=True, side_effect=PolyMorpheme._render) as render:
+            ss = compute_PM_singular_sequences(t.constant, t.groups)
+
+            self.assertListEqual(sorted(ss), sorted(ss, key=lambda u: u.sort_key))
+            self.assertEqual(len(set(u.key for u in ss)), len(ss))
+            self.assertEqual(render.call_count, 0)
+
+        self.assertEqual(str(ss[1]), str(IEMLParser().parse(str(ss[1]))))
+        self.assertEqual(PolyMorpheme(constant=[t.groups[0][0][0]]), t.groups[0][0][0])
+        self.assertEqual(hash(PolyMorpheme(constant=[t.groups[0][0][0]])), hash(t.groups[0][0][0]))
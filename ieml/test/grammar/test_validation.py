@@ -0,0 +1,33 @@
+import unittest
+
+from ieml.usl import validate_many, check_word
+from ieml.usl.usl import usl
+
+
+class TestValidation(unittest.TestCase):
+    USLS = ["[! E:A:. (m4(U: S: T:))(wa. m0(U:)) > E:A:. E:A:. (U: wa. m0(U:))(k.a.-k.a.-')]",
+            "[! E:A:. ()(wa.)]",
+            "o. m1(U: S:) m2(t. m.)",
+            "U: wa. m0(U:)",
+            "S:",
+            "not an usl"]
+
+    def test_validate_many(self):
+        reports = validate_many(self.USLS)
+
+        self.assertListEqual([r.valid for r in reports], [False, True, True, False, True, False])
+        self.assertListEqual([len(r.violations) for r in reports], [5, 0, 0, 2, 0, 1])
+
+        # all the violations are reported, the first one is the error raised by the check
+        with self.assertRaises(ValueError) as e:
+            check_word(usl(self.USLS[0]))
+        self.assertEqual(reports[0].violations[0].message, str(e.exception))
+        self.assertSetEqual({v.component for v in reports[0].violations},
+                            {'m4(U: S: T:)', 'wa. m0(U:)', 'U: wa. m0(U:)'})
+
+    def test_validate_many_workers(self):
+        reports = validate_many(self.USLS * 3)
+        reports_workers = validate_many(self.USLS * 3, workers=2, chunk_size=4)
+
+        self.assertListEqual([(r.usl, r.violations) for r in reports],
+                             [(r.usl, r.violations) for r in reports_workers])
@@ -1,7 +1,7 @@
 import unittest
 
-from ieml.usl import Word, check_word
-from ieml.usl.usl import usl
+from ieml.usl import Word, check_word, get_index
+from ieml.usl.usl import usl, encode_sort_key, SORT_KEY_INT_SIZE
 
 
 class WordsTest(unittest.TestCase):
@@ -43,3 +43,68 @@ class WordsTest(unittest.TestCase):
         for w in WORDS:
             u = usl(w)
             self.assertGreater(u.cardinal, 1)
+
+    def test_singular_sequences_product(self):
+        u = usl("[! E:S:. (m1(wa. wo.))(u. m1(B: E:U:. E:U:T:.) m1(s. b.))]")
+        ss = u.singular_sequences
+
+        self.assertEqual(len(ss), 36)
+        self.assertListEqual([str(s) for s in ss], [str(ss[i]) for i in range(len(ss))])
+        self.assertEqual(str(ss[-1]), str(list(ss)[-1]))
+
+        for i, s in enumerate(ss):
+            self.assertEqual(ss.index_of(s), i)
+            self.assertIn(s, u)
+
+        self.assertIn(usl("[! E:S:. (wa.)(u. B: s.)]"), u)
+        self.assertNotIn(usl("[! E:S:. (wa.)(u. B: t.)]"), u)
+        self.assertNotIn(usl("[! E:S:. (m1(wa. wo.))(u. m1(B: E:U:. E:U:T:.) m1(s. t.))]"), u)
+
+    def test_sample(self):
+        u = usl("[E:B:. (E:.-wa.-t.o.-' E:.-'we.-S:.-'t.o.-',)(i.k.- m1(wa. wo. wu.)) > ! E:.k.- (E:.wo.- E:.-n.S:.-' E:S:.-d.u.-')(b.a.-b.a.-f.o.-' m2(s. b. t.))]")
+
+        sample = u.sample(10, seed=3)
+        self.assertEqual(len(set(sample)), 10)
+        self.assertListEqual(sample, u.sample(10, seed=3))
+        for ss in sample:
+            self.assertIn(ss, u.singular_sequences)
+
+        self.assertSetEqual(set(u.sample(u.cardinal, seed=0)), set(u.singular_sequences))
+
+    def test_syntagmatic_function_key(self):
+        u = usl("[E:B:. (E:.-wa.-t.o.-' E:.-'we.-S:.-'t.o.-',)(i.k.- m1(wa. wo. wu.)) > ! E:.k.- (E:.wo.- E:.-n.S:.-' E:S:.-d.u.-')(b.a.-b.a.-f.o.-' m2(s. b. t.))]")
+        ss = list(u.singular_sequences)
+
+        for w0, w1 in zip(ss, ss[1:]):
+            self.assertEqual(w0.syntagmatic_fun < w1.syntagmatic_fun, w0.syntagmatic_fun.key < w1.syntagmatic_fun.key)
+            self.assertNotEqual(w0.syntagmatic_fun, w1.syntagmatic_fun)
+
+        w = usl(str(ss[0]))
+        self.assertEqual(w.syntagmatic_fun, ss[0].syntagmatic_fun)
+        self.assertEqual(hash(w.syntagmatic_fun), hash(ss[0].syntagmatic_fun))
+        self.assertEqual(w.syntagmatic_fun.render_with_context(w.role, w.context_type), str(ss[0]))
+
+    def test_sort_key(self):
+        u = usl("[! E:A:. E:S:.-k.u.-' j.-U:.-'d.o.-l.o.-', (m1(wa. we.)) > E:A:. E:S:.-k.u.-' j.-A:.-'d.o.-l.o.-', (m2(a. i. u.))]")
+        ss = list(u.singular_sequences)
+
+        self.assertListEqual(sorted(ss, key=lambda w: w.sort_key), sorted(ss))
+        self.assertEqual(len({w.sort_key for w in ss}), len(ss))
+
+    def test_get_index_order(self):
+        u = usl("[! E:A:. E:S:.-k.u.-' j.-U:.-'d.o.-l.o.-', (m1(wa. we.)) > E:A:. E:S:.-k.u.-' j.-A:.-'d.o.-l.o.-', (m2(a. i. u.))]")
+        usls = [u, *u.singular_sequences,
+                usl("(m1(E:.wo.U:.-t.o.-' E:.wo.A:.-t.o.-'))(n.-T:.A:.-' m1(E:T:S:. E:T:T:.))"),
+                usl("()(n.-T:.A:.-' m1(E:T:S:. E:T:T:.))"),
+                usl("t.o.- m1(S:.E:A:S:.- S:.E:A:B:.- S:.E:A:T:.-)"),
+                usl("n.-T:.A:.-' t.o.-"),
+                usl("n.-T:.A:.-' m1(u.l.- a.B:.-)")]
+
+        self.assertListEqual(sorted(usls, key=lambda e: get_index(e, None)[1]), sorted(usls))
+        self.assertListEqual([get_index(e, None)[0] for e in sorted(usls)], [1] * 3 + [2] * 2 + [3] * (1 + u.cardinal))
+
+    def test_sort_key_overflow(self):
+        with self.assertRaises(ValueError):
+            encode_sort_key((1, 2 ** (8 * SORT_KEY_INT_SIZE)))
+        with self.assertRaises(ValueError):
+            encode_sort_key((-1,))
@@ -1,7 +1,7 @@
 import unittest
 
-from ieml.usl.decoration.instance import InstancedUSL
-from ieml.usl.decoration.path import path
+from ieml.usl.decoration.instance import InstancedUSL, Decoration
+from ieml.usl.decoration.path import path, RolePath
 from ieml.usl.usl import usl
 
 
@@ -11,15 +11,29 @@ class TestIterStructurePath(unittest.TestCase):
 
 		print('\n'.join("{} {}".format(str(s), str(v)) for s, v in w.iter_structure_path()))
 
+	def test_structure_paths(self):
+		w = usl("[! E:A:. ()(m.-B:.A:.-') > E:A:. E:A:. (E:B:.-d.u.-')(p.E:A:T:.- m1(S:))]")
+
+		paths = w.structure_paths()
+		self.assertIs(w.structure_paths(), paths)
+		self.assertListEqual(list(w.iter_structure_path()), list(paths))
+		self.assertListEqual(list(paths), list(w._iter_structure_path()))
+
+	def test_iter_word_roles_order(self):
+		# the paths of a word follow the order of the roles, not their order in the string
+		w = usl("[! E:S:. ()(u.A:.-) > E:.s.- ()(E:T:.x.-) > E:.l.- ()(E:.-U:.s.-l.-')]")
+
+		roles = [str(p) for p, _ in w.iter_structure_path() if isinstance(p, RolePath) and p.child is None]
+		self.assertListEqual(roles, [">role>! E:S:.", ">role>E:.l.-", ">role>E:.s.-"])
 
 	def test_instanciated_usl(self):
 		w = usl("[! E:A:. ()(m.-B:.A:.-') > E:A:. E:A:. (E:B:.-d.u.-')(p.E:A:T:.- m1(S:))]")
 
-		x = path(">role>E:A:.>content>constant>m.-B:.A:.-'").deference(w)
-		x.set_literal("test")
+		p = path(">role>E:A:.>content>constant>m.-B:.A:.-'")
 
-		i_u = InstancedUSL.from_usl(w)
+		i_u = InstancedUSL(w, [Decoration(p, "test")])
 		self.assertEqual(i_u.decorations[0].value, 'test')
+		self.assertEqual(i_u.get_value(p), 'test')
 
 
 
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 import tqdm
@@ -5,9 +6,9 @@ import tqdm
 from ieml.dictionary.script import Script
 from ieml.ieml_database import IEMLDatabase, GitInterface
 from ieml.usl import PolyMorpheme, Lexeme, Word
-from ieml.usl.decoration.parser.parser import PathParser
+from ieml.usl.decoration.parser.parser import PathParser, parse_path
 from ieml.usl.decoration.path import PolymorphemePath, GroupIndex, FlexionPath, LexemeIndex, LexemePath, RolePath, \
-	usl_from_path_values, path
+	usl_from_path_values, usls_from_path_values, path
 from ieml.usl.parser import IEMLParser
 from ieml.usl.syntagmatic_function import SyntagmaticRole
 from ieml.usl.usl import usl
@@ -130,6 +131,61 @@ class TestPath(unittest.TestCase):
 		p0_prefix = path(">role>! E:A:.>content>group_0 1")
 		self.assertTrue(p0.has_prefix(p0_prefix))
 
+	def test_interned_paths(self):
+		p = path(">role>! E:A:.>content>group_0 1>S:")
+		self.assertIs(path(">role>! E:A:.>content>group_0 1>S:"), p)
+		self.assertIs(p.child.child.without_morpheme(), path(">group_0 1"))
+		self.assertIs(p.as_constant(), p.as_constant())
+		self.assertIs(pickle.loads(pickle.dumps(p)), p)
+
+		with self.assertRaises(AttributeError):
+			p.child = None
+
+		# the multiplicity of the constant is not in the string of the path
+		p0 = PolymorphemePath(GroupIndex.CONSTANT, usl('S:'), multiplicity=1)
+		p1 = PolymorphemePath(GroupIndex.CONSTANT, usl('S:'))
+		self.assertIsNot(p0, p1)
+		self.assertEqual(p0, p1)
+		self.assertEqual(hash(p0), hash(p1))
+		self.assertNotEqual(PolymorphemePath(GroupIndex.GROUP_0, usl('S:'), multiplicity=1),
+							PolymorphemePath(GroupIndex.GROUP_0, usl('S:')))
+
+	def test_parse_path_cache(self):
+		s = ">role>! E:A:.>content>group_1 1>y."
+		p = parse_path(s)
+		hits = parse_path.cache_info().hits
+		self.assertIs(path(s), p)
+
+		# the ply tables of a parser are built on its first uncached parse only
+		parser = PathParser()
+		self.assertIs(parser.parse(s), p)
+		self.assertIsNone(parser._parser)
+		self.assertEqual(parse_path.cache_info().hits, hits + 2)
+
+		# the uncached parser builds the same interned path
+		self.assertIs(PathParser().parse_uncached(s), p)
+
+	def test_structure_index(self):
+		u = usl("[! E:A:.  ()(b.-S:.A:.-'S:.-'S:.-', m1(S: B: T:) m2(y. o. e. u. a. i.)) > E:A:. E:A:. (m1(E:U:T:. E:A:T:. E:S:T:. E:B:T:. E:T:T:.))(k.a.-k.a.-')]")
+		index = u.structure_index
+		self.assertIs(u.structure_index, index)
+
+		for p, node in u.iter_structure_path():
+			self.assertIn(p, index.paths_of(node))
+			self.assertEqual(p.deference(u), index.node(p))
+			self.assertTrue(p.contained(u))
+
+		# the multiplicity is not checked by the deference
+		p = path(">role>! E:A:.>content>group_1 1>y.")
+		self.assertIsNone(index.node(p))
+		self.assertEqual(p.deference(u), usl('y.'))
+
+		p = path(">role>! E:A:.>content>constant>S:")
+		self.assertFalse(p.contained(u))
+
+		v = pickle.loads(pickle.dumps(u))
+		self.assertEqual(len(v.structure_index.nodes), len(index.nodes))
+
 	def test_usl_from_path(self):
 		structure = {">role>! E:A:.>flexion>E:": "E:",
 					">role>! E:A:.>content>constant>b.-S:.A:.-'S:.-'S:.-',": "b.-S:.A:.-'S:.-'S:.-',",
@@ -194,6 +250,20 @@ class TestPath(unittest.TestCase):
 		u = usl_from_path_values(structure)
 		self.assertEqual(str(u), "U: A: k.a.-k.a.-' b.-S:.A:.-'S:.-'S:.-',")
 
+	def test_usls_from_path_values(self):
+		u = usl("[! E:A:.  ()(b.-S:.A:.-'S:.-'S:.-', m1(S: B: T:) m2(y. o. e. u. a. i.)) > E:A:. E:A:. (m1(E:U:T:. E:A:T:. E:S:T:. E:B:T:. E:T:T:.))(k.a.-k.a.-')]")
+		flexion = path(">role>E:A:. E:A:.>flexion")
+
+		constant = [(p, ss) for p, ss in u.iter_structure_path_by_script_ss() if not p.has_prefix(flexion)]
+		variations = [[(p.as_constant(ss), ss)] for p, ss in u.iter_structure_path_by_script_ss() if p.has_prefix(flexion)]
+
+		res = usls_from_path_values(variations, constant_paths_values=constant)
+		self.assertListEqual(res, [usl_from_path_values(constant + v) for v in variations])
+		self.assertEqual(len(set(res)), 6)
+		# the unchanged sub-structures are shared
+		root = path(">role>! E:A:.")
+		self.assertIs(root.deference(res[0]), root.deference(res[1]))
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,40 @@
+import numpy as np
+
+from ieml.dictionary.script import script
+from ieml.test.dictionary.dictionary_testcase import DictionaryTestCase
+from ieml.usl import PolyMorpheme
+from ieml.usl.distance import ProximityEngine
+
+
+class TestProximity(DictionaryTestCase):
+    def setUp(self):
+        self.engine = ProximityEngine(self.dictionary)
+
+    def test_morpheme_vectors(self):
+        vectors = self.engine.morpheme_vectors([script('wa.'), script('wo.')])
+        self.assertEqual(vectors.shape, (2, len(self.dictionary.scripts)))
+        self.assertTrue(np.allclose(vectors.sum(axis=1), 1.0))
+
+        self.assertGreater(self.engine.morpheme_proximity(script('wa.'), script('wa.')),
+                           self.engine.morpheme_proximity(script('wa.'), script('wo.')))
+
+    def test_scores(self):
+        usls = [PolyMorpheme(constant=[script(s)]) for s in ['wa.', 'wo.', 'we.']] + \
+               [PolyMorpheme(constant=[script('wa.'), script('wo.')])]
+
+        vectors = self.engine.usl_vectors(usls)
+        self.assertTrue(np.allclose(self.engine.scores(usls, usls), vectors.dot(vectors.T)))
+        self.assertAlmostEqual(self.engine.proximity(usls[0], usls[0]), 1.0)
+
+    def test_nearest(self):
+        usls = [PolyMorpheme(constant=[script(s)]) for s in ['wa.', 'wo.', 'we.', 'wu.']] + \
+               [PolyMorpheme(constant=[script('wa.'), script('wo.')])]
+
+        nearest = self.engine.nearest(usls[:2], usls, k=2)
+        self.assertEqual(len(nearest), 2)
+        for q, res in zip(usls[:2], nearest):
+            self.assertEqual(len(res), 2)
+            self.assertNotIn(q, [u for u, _ in res])
+            self.assertGreaterEqual(res[0][1], res[1][1])
+
+        self.assertEqual(nearest[0][0][0], usls[-1])
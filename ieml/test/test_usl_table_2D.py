@@ -1,9 +1,10 @@
 import unittest
 from itertools import chain
+from unittest import mock
 
 from ieml.usl import PolyMorpheme
-from ieml.usl.decoration.path import path, PolymorphemePath
-from ieml.usl.table import UslTable2D
+from ieml.usl.decoration.path import path, PolymorphemePath, PathValuesBuilder
+from ieml.usl.table import UslTable2D, UslTableND
 from ieml.usl.usl import usl
 
 
@@ -282,6 +283,63 @@ class TestUslTable2D(unittest.TestCase):
 						self.assertIn(m_c, cell.morphemes)
 
 
+	def test_lazy_cells(self):
+		u = usl("[! E:A:.  ()(b.-S:.A:.-'S:.-'S:.-', m1(S: B: T:) m2(y. o. e. u. a. i.)) > E:A:. E:A:. (m1(E:U:T:. E:A:T:. E:S:T:. E:B:T:. E:T:T:.))(k.a.-k.a.-')]")
+		table = UslTable2D(u, rows=None, columns=path(">role>E:A:. E:A:.>flexion"))
+		self.assertEqual(table.shape, (73, 6))
+
+		page = table.page(10, 12, 1, 4)
+		self.assertEqual((len(page), len(page[0])), (2, 3))
+		self.assertIs(page[1][2], table.cell(11, 3))
+		self.assertIs(table.cell_sequence[11 * 6 + 3], table.cell(11, 3))
+		self.assertIs(table.row(5), table.rows[5])
+		self.assertIs(table.column(2), table.columns[2])
+
+		self.assertListEqual(list(chain.from_iterable(table.iter_pages(page_size=10))), table.cells)
+
+
+	def test_headers_order(self):
+		# the rows vary in three roles
+		u = usl("[! E:S:. (m1(wa. wo.))(u.A:.- m1(B: E:U:. E:U:T:.) m1(s. t.)) > E:.s.- ()(E:T:.x.- m1(y. o.)) > E:.l.- (m1(E:.-U:.s.-l.-' E:.-U:.d.-l.-'))]")
+		table = UslTable2D(u, rows=None, columns=path(">role>! E:S:.>flexion"))
+
+		# one USL by polymorpheme of variation, none by row
+		with mock.patch.object(PathValuesBuilder, 'build', autospec=True, side_effect=PathValuesBuilder.build) as build:
+			self.assertEqual(table.shape, (108, 3))
+			self.assertEqual(build.call_count, 3)
+
+		self.assertEqual(table.rows, sorted(table.rows))
+		self.assertEqual(table.columns, sorted(table.columns))
+		self.assertEqual(len(set(table.rows)), 108)
+
+
+	def test_dimensions(self):
+		u = usl("(m1(E:.wo.U:.-t.o.-' E:.wo.A:.-t.o.-'))(n.-T:.A:.-' m1(E:T:S:. E:T:T:. we.f.T:.- u.A:.- p.E:A:S:.- s.-S:.A:.-') m1(E:S:.x.- n.-T:.U:.-'))")
+		table = UslTableND(u)
+		self.assertListEqual(table.dimensions, [path(">content>group_0 1"), path(">content>group_1 1"), path(">flexion")])
+		self.assertEqual(table.shape, (7, 3, 3))
+
+		cells = [c for _, _, rows in table.iter_tabs(page_size=2) for row in rows for c in row]
+		self.assertEqual(len(cells), u.cardinal)
+		self.assertSetEqual(set(cells), set(u.singular_sequences))
+
+		tab = table.tab(2)
+		self.assertEqual((len(tab), len(tab[0])), (7, 3))
+		self.assertIs(tab[4][1], table.cell(4, 1, 2))
+		for i in range(3):
+			self.assertIn(table.header(2, 2).constant[0], table.cell(4, i, 2).morphemes)
+
+	def test_polymorpheme_dimension(self):
+		# the singular sequences of the content are not the product of its groups
+		u = usl("[! E:A:.  ()(b.-S:.A:.-'S:.-'S:.-', m1(S: B: T:) m2(y. o. e. u. a. i.)) > E:A:. E:A:. (m1(E:U:T:. E:A:T:. E:S:T:. E:B:T:. E:T:T:.))(k.a.-k.a.-')]")
+		table = UslTableND(u)
+		self.assertListEqual(table.dimensions, [path(">role>! E:A:.>content"), path(">role>E:A:. E:A:.>flexion")])
+		self.assertEqual(table.shape, (73, 6))
+		self.assertSetEqual(set(chain.from_iterable(table.tab())), set(u.singular_sequences))
+
+		with self.assertRaises(ValueError):
+			UslTableND(u, dimensions=[path(">role>! E:A:.>content"), path(">role>! E:A:.>content>group_0 1")])
+
 
 if __name__ == '__main__':
 	unittest.main()
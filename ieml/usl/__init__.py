@@ -3,6 +3,7 @@ from .usl import USL
 from .polymorpheme import PolyMorpheme, check_polymorpheme
 from .lexeme import Lexeme, check_lexeme
 from .word import Word, check_word
+from .validation import validate_many, ValidationReport, Violation
 # from .phrase import Phrase, check_phrase
 
 from string import ascii_uppercase, ascii_lowercase, digits
@@ -12,21 +13,29 @@ alphanumeric = sorted(digits + ascii_uppercase + ascii_lowercase)
 def int2base(i, max=30, characters=alphanumeric):
     assert i >= 0
 
-    q = i // len(characters)
-    r = i - q * len(characters)
-
-    if q != 0:
-        return int2base(q, max - 1, characters) + characters[r]
-    else:
-        return '0'*(max - 1) + characters[r]
-
-
-def _polymorph_idx(pm, dic):
-    return sum(len(dic.scripts) ** i * dic.index[ss] for i, ss in enumerate(pm.constant))
+    digits = []
+    while True:
+        i, r = divmod(i, len(characters))
+        digits.append(characters[r])
+        if i == 0:
+            break
 
+    return '0' * (max - len(digits)) + ''.join(reversed(digits))
 
 
 def get_index(s, dic):
+    """
+    The sort index of an USL in the database listing, the morphemes are ordered by their index in the dictionary and
+    the other USLs by their USL.sort_key (hex encoded), consistent with USL.__lt__.
+
+    The index strings are compared lexicographically. The hex encoding keeps the byte order of the sort keys (two
+    digits by byte, 0-9 before a-f), and the variable length of the sort keys does not need a padding: a sort key is
+    never the prefix of another one, two different keys differ before the end of the shortest.
+
+    :param s: a script or an USL
+    :param dic: the dictionary
+    :return: the type index in TYPES (0: morpheme, 1: polymorpheme, 2: lexeme, 3: word) and the sort index
+    """
     if isinstance(s, Script):
         return (0, '0' + int2base(dic.index[s]))
 
@@ -34,8 +43,8 @@ def get_index(s, dic):
         if len(s.constant) == 1 and len(s.groups) == 0:
             return (0, '0' + int2base(dic.index[s.constant[0]]))
         else:
-            return (1, '1' + int2base(_polymorph_idx(s, dic)))
-    elif isinstance(s, Word):
-        return (2, '2' + int2base(0))
+            return (1, '1' + s.sort_key.hex())
+    elif isinstance(s, Lexeme):
+        return (2, '2' + s.sort_key.hex())
     else:
-        return (3, '3' + int2base(0))
+        return (3, '3' + s.sort_key.hex())
@@ -410,6 +410,15 @@ def assert_(cond, message):
         raise ValueError(message)
 
 
+def iter_assert_errors(checks):
+    """Run all the checks (functions that raise a ValueError on failure) and yield the error messages."""
+    for check in checks:
+        try:
+            check()
+        except ValueError as e:
+            yield str(e)
+
+
 def assert_all_in(l: List[Script], _set: Set[Script], name_l):
     assert_(all(s in _set or s.empty for s in l),
             "Invalid scripts [{}] in {}. Received: [{}]".format(
@@ -488,20 +497,36 @@ def check_flexion_process_scripts(l: List[Script], sfun=None):
 
 
 def check_address_script(l: List[Script], sfun_type):
-    assert_all_in(l, set(ADDRESS_SCRIPTS), "an address")
+    for _, message in iter_address_script_errors(l, sfun_type):
+        raise ValueError(message)
+
+
+def iter_address_script_errors(l: List[Script], sfun_type):
+    """
+    Yield every violation of the address checks.
+
+    :param l: the scripts of the address
+    :param sfun_type: the type of the syntagmatic function of the address
+    :return: an iterator of (address, error message)
+    """
+    checks = [lambda: assert_all_in(l, set(ADDRESS_SCRIPTS), "an address")]
 
     if any(e in {*ADDRESS_PROCESS_VALENCE_SCRIPTS, *ACTANTS_SCRIPTS} for e in l):
-        assert_only_one_from(l, {*ADDRESS_PROCESS_VALENCE_SCRIPTS, *ACTANTS_SCRIPTS}, "an address", "grammatical roles")
+        checks.append(lambda: assert_only_one_from(l, {*ADDRESS_PROCESS_VALENCE_SCRIPTS, *ACTANTS_SCRIPTS}, "an address", "grammatical roles"))
 
-    assert_atmost_one_from(l, {INDEPENDANT_QUALITY}, "an address", "independant quality")
+    checks.append(lambda: assert_atmost_one_from(l, {INDEPENDANT_QUALITY}, "an address", "independant quality"))
 
     from ieml.usl.syntagmatic_function import DependantQualitySyntagmaticFunction, IndependantQualitySyntagmaticFunction
     if sfun_type == DependantQualitySyntagmaticFunction:
-        assert_no_one_from(l, {*ADDRESS_PROCESS_VALENCE_SCRIPTS, *ADDRESS_ACTANTS_MOTOR_SCRIPTS, *ADDRESS_CIRCONSTANTIAL_ACTANTS_SCRIPTS},
-                           "an address of an ActantSyntagmaticFunction", "grammatical roles")
+        checks.append(lambda: assert_no_one_from(l, {*ADDRESS_PROCESS_VALENCE_SCRIPTS, *ADDRESS_ACTANTS_MOTOR_SCRIPTS, *ADDRESS_CIRCONSTANTIAL_ACTANTS_SCRIPTS},
+                           "an address of an ActantSyntagmaticFunction", "grammatical roles"))
     elif sfun_type == IndependantQualitySyntagmaticFunction:
-        assert_no_one_from(l, {*ADDRESS_PROCESS_VALENCE_SCRIPTS, *ADDRESS_ACTANTS_MOTOR_SCRIPTS, *ADDRESS_CIRCONSTANTIAL_ACTANTS_SCRIPTS, DEPENDANT_QUALITY},
-                           "an address of an IndependantQualitySyntagmaticFunction", "grammatical roles")
+        checks.append(lambda: assert_no_one_from(l, {*ADDRESS_PROCESS_VALENCE_SCRIPTS, *ADDRESS_ACTANTS_MOTOR_SCRIPTS, *ADDRESS_CIRCONSTANTIAL_ACTANTS_SCRIPTS, DEPENDANT_QUALITY},
+                           "an address of an IndependantQualitySyntagmaticFunction", "grammatical roles"))
+
+    address = ' '.join(map(str, l))
+    for message in iter_assert_errors(checks):
+        yield address, message
 
 def check_flexion_actant_scripts(l: List[Script], sfun=None):
     assert_all_in(l, ADDRESS_ACTANT_SCRIPTS, "a flexion of an actant")
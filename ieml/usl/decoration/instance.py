@@ -1,29 +1,11 @@
+from itertools import chain
 from typing import List
 
-from ieml.commons import DecoratedComponent
+from ieml.commons import ProductSequence
 from ieml.dictionary.script import Script
-from ieml.usl import USL
-from ieml.usl.decoration.path import UslPath, FlexionPath
-
-
-class LiteralContext:
-	def __init__(self):
-		self.stack = []
-
-	def __enter__(self):
-		self.stack = []
-
-	def __exit__(self, exc_type, exc_val, exc_tb):
-		for s in self.stack:
-			s.clear_literal()
-		self.stack = []
-
-	def push(self, u):
-		self.stack.append(u)
-
-__literal_context =LiteralContext()
-def literal_context():
-	return __literal_context
+from ieml.usl import USL, Word, Lexeme
+from ieml.usl.decoration.path import UslPath, FlexionPath, RolePath, LexemePath, LexemeIndex
+from ieml.usl.syntagmatic_function import JunctionSyntagmaticFunction
 
 
 class Decoration:
@@ -31,10 +13,6 @@ class Decoration:
 		self.path = path
 		self.value = value
 
-	def apply(self, u: DecoratedComponent):
-		tgt = self.path.deference(u)
-		tgt.set_literal(self.value)
-
 	def __str__(self):
 		return '[{} "{}"]'.format(str(self.path), str(self.value).replace('"', r'\"'))
 
@@ -44,43 +22,159 @@ class Decoration:
 	def __eq__(self, other):
 		return str(self) == str(other)
 
+
+def _product_factor(u: USL, path: UslPath):
+	"""
+	The factor of the product of the singular sequences of the usl that the path goes through.
+
+	:param u: the usl, a Word or a Lexeme with a ProductSequence of singular sequences
+	:param path: a path in the usl
+	:return: (index of the factor, path in the components of the factor), None if the path is in all the singular
+	sequences
+	"""
+	if path.__class__ is UslPath and path.child is None:
+		return None
+
+	if isinstance(u, Word) and isinstance(path, RolePath):
+		sfun = u.syntagmatic_fun
+		# the factors are the actors in the order of SyntagmaticFunction.as_list
+		roles = [r for r, f in sfun.actors.items() if not isinstance(f, JunctionSyntagmaticFunction)]
+		k = roles.index(sfun.actor_role(path.role, ignore_prefix=True, ignore_process_valence=True))
+	elif isinstance(u, Lexeme) and isinstance(path, LexemePath):
+		k = 0 if path.index == LexemeIndex.FLEXION else 1
+	else:
+		raise ValueError("Invalid path " + str(path) + " for the singular sequences of a " + u.__class__.__name__)
+
+	return None if path.child is None else (k, path.child)
+
+
+class DecorationsSplit:
+	"""
+	The decorations of an InstancedUSL split on the factors of the product of the singular sequences of its usl. The
+	decorations of a factor are resolved once by component of the factor, the decorations of a singular sequence are
+	the union of the ones of its components.
+	"""
+	__slots__ = ('decorations', 'factors', 'build', 'common', 'paths', 'components')
+
+	def __init__(self, u: USL, decorations: List[Decoration]):
+		"""
+		:param u: the usl
+		:param decorations: the sorted decorations of the usl
+		"""
+		self.decorations = decorations
+
+		sequences = u.singular_sequences
+		product = isinstance(sequences, ProductSequence)
+		if product:
+			self.factors = sequences.factors
+			self.build = sequences.build
+		else:
+			# a single factor, its components are the singular sequences
+			self.factors = (sequences,)
+			self.build = lambda components: components[0]
+
+		# the indexes of the decorations of all the singular sequences
+		self.common = []
+		# for each factor, the (index of the decoration, path in the components of the factor)
+		self.paths = [[] for _ in self.factors]
+		for j, d in enumerate(decorations):
+			factor = _product_factor(u, d.path) if product else (0, d.path)
+			if factor is None:
+				self.common.append(j)
+			else:
+				self.paths[factor[0]].append((j, factor[1]))
+
+		# for each factor, index of a component -> indexes of its decorations
+		self.components = [{} for _ in self.factors]
+
+	def component_decorations(self, k: int, i: int):
+		"""The indexes of the decorations of the component i of the factor k"""
+		res = self.components[k].get(i)
+		if res is None:
+			component = self.factors[k][i]
+			res = self.components[k][i] = tuple(j for j, p in self.paths[k] if p.contained(component))
+		return res
+
+	def decorations_at(self, indexes):
+		"""The sorted decorations of the singular sequence of the components indexes"""
+		res = chain(self.common, *(self.component_decorations(k, i) for k, i in enumerate(indexes)))
+		return [self.decorations[j] for j in sorted(res)]
+
+	def singular_sequence_at(self, indexes):
+		"""The singular sequence of the usl of the components indexes"""
+		return self.build(tuple(f[i] for f, i in zip(self.factors, indexes)))
+
+
 class InstancedUSL(USL):
+	__slots__ = ('usl', 'flexion', 'decorations', 'overlay', '_split')
+
 	# last in the  list
 	syntactic_level = 10
 
-	def __init__(self, u: 'USL', decorations: List[Decoration]):
+	# the decorations are kept per instance, equal instanced usls are not shared
+	canonical_nodes = False
+
+	_unpickled_caches = USL._unpickled_caches + ('_split',)
+
+	def __init__(self, u: 'USL', decorations: List[Decoration], checked=False):
+		"""
+		:param u: the usl
+		:param decorations: the decorations of the usl
+		:param checked: if the decorations are already known to be in the usl and sorted, as the decorations of the
+		singular sequences of an InstancedUSL
+		"""
 		super().__init__()
-		# clone usl, remove literals
-		# from ieml.usl.usl import usl
+		# the decorations are not written on the nodes of the usl, they can be shared
 		self.usl = u
 		self.grammatical_class = self.usl.grammatical_class
 
 		self.flexion = False
-		with literal_context():
-			for decoration in decorations:
-				if not isinstance(decoration, Decoration):
-					raise ValueError("Invalid argument for a InstantiatedUSL, expected a Decoration, got a "+\
-									 decoration.__class__.__name__)
+		# path -> value of the decorations
+		self.overlay = {}
+		for decoration in decorations:
+			if not isinstance(decoration, Decoration):
+				raise ValueError("Invalid argument for a InstantiatedUSL, expected a Decoration, got a "+\
+								 decoration.__class__.__name__)
+
+			self.flexion = isinstance(decoration.path, FlexionPath) or self.flexion
+
+			if not checked and self.usl.structure_index.node(decoration.path) is None:
+				# not a structure path of the usl, raise a DeferenceError if it is not in the usl
+				decoration.path.deference(self.usl)
 
-				self.flexion = isinstance(decoration.path, FlexionPath) or self.flexion
+			self.overlay[decoration.path] = decoration.value
 
-				decoration.apply(self.usl)
+		if checked:
+			self.decorations = list(decorations)
+		else:
+			self.decorations = InstancedUSL.list_decorations(self.usl, self.overlay, flexion=self.flexion)
 
-			self.decorations = InstancedUSL.list_decorations(self.usl, flexion=self.flexion)
+		self._split = None
 
 	@staticmethod
-	def list_decorations(u: USL, flexion=False):
+	def list_decorations(u: USL, overlay, flexion=False):
+		"""
+		The decorations of the overlay, the paths of the usl structure first.
+
+		:param u: the usl
+		:param overlay: the values of the decorations, path -> value
+		:param flexion: the flexion mode of the paths
+		:return: the sorted list of the Decoration
+		"""
 		decorations = []
+		seen = set()
 
-		for path, value in u.iter_structure_path(flexion):
-			if value.get_literal() is not None:
-				decorations.append(Decoration(path, value.get_literal()))
+		for path, _ in u.iter_structure_path(flexion):
+			if path in overlay and path not in seen:
+				seen.add(path)
+				decorations.append(Decoration(path, overlay[path]))
 
+		decorations.extend(Decoration(path, value) for path, value in overlay.items() if path not in seen)
 		return sorted(decorations)
 
-	@staticmethod
-	def from_usl(u: 'USL'):
-		return InstancedUSL(u, InstancedUSL.list_decorations(u))
+	def get_value(self, path: UslPath):
+		"""The value of the decoration at the path, None if the path is not decorated"""
+		return self.overlay.get(path)
 
 	def __str__(self):
 		return "{} {}".format(str(self.usl), ' '.join(map(str, self.decorations))).strip()
@@ -96,28 +190,58 @@ class InstancedUSL(USL):
 	def iter_structure(self):
 		return self.usl.iter_structure()
 
-	def iter_structure_path(self, flexion=False):
-		return self.usl.iter_structure_path(flexion=flexion)
+	def structure_paths(self, flexion=False):
+		return self.usl.structure_paths(flexion=flexion)
 
 	def do_lt(self, other):
 		return self.usl.do_lt(other)
 
-	def _compute_singular_sequences(self):
-		res = []
-		for ss in self.usl.singular_sequences:
-			dec = []
-			with literal_context():
-				for d in self.decorations:
+	def _compute_order_key(self):
+		return self.usl.order_key
 
-					if d.path.contained(ss):
-						dec.append(d)
+	def _compute_singular_sequences(self):
+		# the decorations are resolved once by component of the product of the singular sequences of the usl
+		if self._split is None:
+			self._split = DecorationsSplit(self.usl, self.decorations)
 
-				if dec:
-					res.append(InstancedUSL(ss, dec))
-				else:
-					res.append(ss)
+		return ProductSequence([range(len(f)) for f in self._split.factors],
+							   build=self._instanced_singular_sequence,
+							   decompose=self._decompose_singular_sequence)
 
-		return res
+	@property
+	def cardinal(self):
+		return self.usl.cardinal
+
+	def _instanced_singular_sequence(self, indexes):
+		ss = self._split.singular_sequence_at(indexes)
+		decorations = self._split.decorations_at(indexes)
+		if decorations:
+			return InstancedUSL(ss, decorations, checked=True)
+		else:
+			return ss
+
+	def _decompose_singular_sequence(self, e):
+		"""The components indexes of an instanced singular sequence, None if it is not one of self"""
+		u = e.usl if isinstance(e, InstancedUSL) else e
+		sequences = self.usl.singular_sequences
+		if isinstance(sequences, ProductSequence):
+			i = sequences.index_of(u)
+		else:
+			i = next((j for j, ss in enumerate(sequences) if ss == u), None)
+
+		if i is None:
+			return None
+
+		indexes = []
+		for f in reversed(self._split.factors):
+			i, r = divmod(i, len(f))
+			indexes.append(r)
+		indexes = tuple(reversed(indexes))
+
+		decorations = e.decorations if isinstance(e, InstancedUSL) else []
+		if [str(d) for d in decorations] != [str(d) for d in self._split.decorations_at(indexes)]:
+			return None
+		return indexes
 
 	@property
 	def morphemes(self):
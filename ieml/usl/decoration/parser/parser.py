@@ -1,6 +1,7 @@
 import logging
 import threading
 import os
+from functools import lru_cache
 from ply.yacc import yacc
 
 from ieml.constants import PARSER_FOLDER
@@ -13,30 +14,61 @@ from ieml.usl.decoration.path import UslPath, RolePath, LexemePath, Polymorpheme
 from ieml.usl.syntagmatic_function import SyntagmaticRole
 
 
+# number of path strings memoized by parse_path
+PATH_CACHE_SIZE = 10000
+
+# a PathParser by thread for parse_path
+_path_parsers = threading.local()
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def parse_path(s: str) -> UslPath:
+    """
+    Parse a path string. The paths are immutable and shared, they are memoized by string, the hits and the misses
+    are counted by parse_path.cache_info().
+
+    :param s: the path string
+    :return: the UslPath
+    """
+    if not hasattr(_path_parsers, 'parser'):
+        _path_parsers.parser = PathParser()
+
+    return _path_parsers.parser.parse_uncached(s)
+
+
 class PathParser:
+    """
+    The parser of the path strings. parse goes through the shared cache of parse_path, the ply tables of an instance
+    are built on its first parse_uncached. An instance is used by one thread at a time, parse_path keeps one by thread.
+    """
     tokens = tokens
-    lock = threading.Lock()
 
     def __init__(self):
-        # Build the lexer and parser
-        self.lexer = get_lexer()
-        self.parser = yacc(module=self, errorlog=logging, start='path',
-                                  # debug=True, debuglog=logging,
-                                  optimize=False,
-                                  picklefile=os.path.join(PARSER_FOLDER, "path_parser.pickle"))
+        self._lexer = None
+        self._parser = None
 
     def parse(self, s):
         if not isinstance(s, str):
             s = str(s)
 
-        with self.lock:
-            try:
-                return self.parser.parse(s, lexer=self.lexer)
-            except ValueError as e:
-                raise CannotParse(s, str(e))
-            except CannotParse as e:
-                e.s = s
-                raise e
+        return parse_path(s)
+
+    def parse_uncached(self, s):
+        if self._parser is None:
+            # Build the lexer and parser
+            self._lexer = get_lexer()
+            self._parser = yacc(module=self, errorlog=logging, start='path',
+                                # debug=True, debuglog=logging,
+                                optimize=False,
+                                picklefile=os.path.join(PARSER_FOLDER, "path_parser.pickle"))
+
+        try:
+            return self._parser.parse(s, lexer=self._lexer)
+        except ValueError as e:
+            raise CannotParse(s, str(e))
+        except CannotParse as e:
+            e.s = s
+            raise e
 
     def p_path(self, p):
         """path : SEPARATOR
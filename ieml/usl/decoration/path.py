@@ -1,5 +1,8 @@
+import threading
 from collections import defaultdict
 from itertools import chain
+from typing import List
+from weakref import WeakValueDictionary
 
 from ieml.commons import OrderedEnum, monitor_decorator
 from ieml.dictionary.script import Script
@@ -20,12 +23,33 @@ SEPARATOR = '>'
 
 
 def path(string) -> 'UslPath':
-	from ieml.usl.decoration.parser.parser import PathParser
+	from ieml.usl.decoration.parser.parser import parse_path
 
-	return PathParser().parse(string)
+	return parse_path(string if isinstance(string, str) else str(string))
 
 
-class UslPath:
+# structure of a path -> shared path node
+_interned_paths = WeakValueDictionary()
+_interned_paths_lock = threading.Lock()
+
+
+class InternedPathMeta(type):
+	"""Metaclass of the paths, the constructors return the shared node of each path structure."""
+	def __call__(cls, *args, **kwargs):
+		p = super().__call__(*args, **kwargs)
+		p._freeze()
+
+		with _interned_paths_lock:
+			return _interned_paths.setdefault(p._intern_key, p)
+
+
+class UslPath(metaclass=InternedPathMeta):
+	"""
+	A path in the tree of an USL. The paths are immutable and interned: the equal constructions return the same node.
+	The equality and the hash use a structural key computed at the construction.
+	"""
+	__slots__ = ('child', '_key', '_intern_key', '_hash', '_derived', '__weakref__')
+
 	USL_TYPE = USL
 
 	def __init__(self, child=None):
@@ -34,12 +58,48 @@ class UslPath:
 				raise ValueError("Invalid path child, expected a UslPath, got a "+ child.__class__.__type__)
 
 		self.child = child
+		# the paths computed from this one: (method, argument) -> path
+		self._derived = None
+
+	def _freeze(self):
+		child = self.child
+		# the key of the equality, as the string of the path
+		object.__setattr__(self, '_key', (self.__class__, self._eq_fields(), None if child is None else child._key))
+		# the key of the structure, all the arguments of the constructors
+		object.__setattr__(self, '_intern_key', (self.__class__, self._fields(),
+												 None if child is None else child._intern_key))
+		object.__setattr__(self, '_hash', hash(self._key))
+
+	def __setattr__(self, key, value):
+		if getattr(self, '_key', None) is not None and key != '_derived':
+			raise AttributeError("A {} is immutable".format(self.__class__.__name__))
+		object.__setattr__(self, key, value)
+
+	def __reduce__(self):
+		return self.__class__, self._fields() + (self.child,)
+
+	def _fields(self):
+		"""The arguments of the constructor, but the child"""
+		return ()
+
+	def _eq_fields(self):
+		"""The fields of the equality of the node"""
+		return self._fields()
+
+	def _derive(self, key, build):
+		if self._derived is None:
+			self._derived = {}
+
+		if key not in self._derived:
+			self._derived[key] = build()
+
+		return self._derived[key]
 
 	def _deference(self, usl):
 		return usl
 
 	def has_prefix(self, prefix: 'UslPath'):
-		if prefix is None:
+		if prefix is None or prefix is self:
 			return True
 
 		if self.__class__ != prefix.__class__ or (self.__class__ == prefix.__class__ and not self._do_eq(prefix)):
@@ -54,9 +114,15 @@ class UslPath:
 		return False
 
 	def as_constant(self, u=None):
+		return self._derive(('as_constant', u), lambda: self._as_constant(u))
+
+	def _as_constant(self, u):
 		return UslPath(child=None if self.child is None else self.child.as_constant(u))
 
 	def without_morpheme(self):
+		return self._derive(('without_morpheme', None), self._without_morpheme)
+
+	def _without_morpheme(self):
 		return UslPath(child=None if self.child is None else self.child.without_morpheme())
 
 	def concat(self, suffix: 'UslPath', force: bool=False) -> 'UslPath':
@@ -108,6 +174,11 @@ class UslPath:
 		if isinstance(usl, InstancedUSL):
 			usl = usl.usl
 
+		if isinstance(usl, USL):
+			node = usl.structure_index.node(self)
+			if node is not None:
+				return node
+
 		if not isinstance(usl, self.USL_TYPE):
 			raise DeferenceError("Invalid Usl type for a " + self.__class__.__name__ + \
 											", expected a " + self.USL_TYPE.__name__ + \
@@ -121,6 +192,14 @@ class UslPath:
 			return node
 
 	def contained(self, usl):
+		from ieml.usl.decoration.instance import InstancedUSL
+
+		if isinstance(usl, InstancedUSL):
+			usl = usl.usl
+
+		if isinstance(usl, USL) and usl.structure_index.node(self) is not None:
+			return True
+
 		try:
 			self.deference(usl)
 			return True
@@ -131,7 +210,8 @@ class UslPath:
 		return ''
 
 	def __str__(self):
-		return SEPARATOR + self._to_str() + (str(self.child) if self.child is not None else '')
+		return self._derive(('str', None),
+							lambda: SEPARATOR + self._to_str() + (str(self.child) if self.child is not None else ''))
 
 	@staticmethod
 	def _from_string(string, children):
@@ -146,7 +226,7 @@ class UslPath:
 		return cls._from_string(split[1], split[2:])
 
 	def __eq__(self, other):
-		return isinstance(other, UslPath) and str(other) == str(self)
+		return self is other or (isinstance(other, UslPath) and self._key == other._key)
 
 	def __lt__(self, other):
 		if other.__class__ != self.__class__:
@@ -161,13 +241,13 @@ class UslPath:
 		return False
 
 	def __hash__(self):
-		return hash(str(self))
+		return self._hash
 
 	def clone(self, use_child=False, child=None):
 		return UslPath(child=(child if use_child else self.child))
 
 	def no_child_clone(self):
-		return self.clone(use_child=True, child=None)
+		return self._derive(('no_child_clone', None), lambda: self.clone(use_child=True, child=None))
 
 	@classmethod
 	def build_usl_from_path_to_node(cls, path_to_node):
@@ -203,6 +283,8 @@ class GroupIndex(OrderedEnum):
 
 
 class PolymorphemePath(UslPath):
+	__slots__ = ('group_idx', 'morpheme', 'multiplicity')
+
 	USL_TYPE = PolyMorpheme
 
 	def __init__(self, group_idx: GroupIndex, morpheme: Script=None, multiplicity=None, child=None):
@@ -211,6 +293,13 @@ class PolymorphemePath(UslPath):
 		self.morpheme = morpheme
 		self.multiplicity = multiplicity
 
+	def _fields(self):
+		return self.group_idx, self.morpheme, self.multiplicity
+
+	def _eq_fields(self):
+		# the multiplicity of the constant is not in the string of the path
+		return self.group_idx, self.morpheme, None if self.group_idx == GroupIndex.CONSTANT else self.multiplicity
+
 	@property
 	def _is_constant_path(self):
 		return self.group_idx == GroupIndex.CONSTANT
@@ -222,7 +311,7 @@ class PolymorphemePath(UslPath):
 	def _has_prefix(self, other):
 		return self.group_idx == other.group_idx and self.multiplicity == other.multiplicity
 
-	def as_constant(self, u=None):
+	def _as_constant(self, u):
 		return PolymorphemePath(group_idx=GroupIndex.CONSTANT,
 								morpheme=self.morpheme if self.morpheme is not None else u,
 								multiplicity=None,
@@ -232,7 +321,7 @@ class PolymorphemePath(UslPath):
 	def _do_lt(self, other):
 		return (self.group_idx, self.morpheme) < (other.group_idx, other.morpheme)
 
-	def without_morpheme(self):
+	def _without_morpheme(self):
 		return PolymorphemePath(group_idx=self.group_idx,
 								morpheme=None,
 								multiplicity=self.multiplicity,
@@ -359,6 +448,8 @@ class PolymorphemePath(UslPath):
 
 
 class FlexionPath(UslPath):
+	__slots__ = ('morpheme',)
+
 	USL_TYPE = PolyMorpheme
 
 	def __init__(self, morpheme, child=None):
@@ -368,15 +459,18 @@ class FlexionPath(UslPath):
 		assert isinstance(morpheme, Script), morpheme.__class__.__name__
 		self.morpheme = morpheme
 
+	def _fields(self):
+		return self.morpheme,
+
 	@property
 	def _is_constant_path(self):
 		return True
 
-	def as_constant(self, u=None):
+	def _as_constant(self, u):
 		return FlexionPath(morpheme=self.morpheme,
 						   child=(None if self.child is None else self.child.as_constant(u)))
 
-	def without_morpheme(self):
+	def _without_morpheme(self):
 		raise ValueError("Unable to create a flexion path without a morpheme")
 		# return FlexionPath(morpheme=None,
 		# 				   child=(None if self.child is None else self.child.without_morpheme()))
@@ -449,6 +543,8 @@ class LexemeIndex(OrderedEnum):
 
 
 class LexemePath(UslPath):
+	__slots__ = ('index',)
+
 	USL_TYPE = Lexeme
 
 	def __init__(self, index: LexemeIndex, child=None):
@@ -464,11 +560,14 @@ class LexemePath(UslPath):
 				assert isinstance(self.child, FlexionPath), \
 					"Invalid path structure, a lexeme flexion child must be a FlexionPath, not a " + self.child.__class__.__name__
 
-	def as_constant(self, u=None):
+	def _fields(self):
+		return self.index,
+
+	def _as_constant(self, u):
 		return LexemePath(index=self.index,
 						  child=(None if self.child is None else self.child.as_constant(u)))
 
-	def without_morpheme(self):
+	def _without_morpheme(self):
 		return LexemePath(index=self.index,
 						  child=(None if self.child is None or self.index == LexemeIndex.FLEXION else self.child.without_morpheme()))
 
@@ -570,6 +669,8 @@ class LexemePath(UslPath):
 
 
 class RolePath(UslPath):
+	__slots__ = ('role', 'has_focus')
+
 	USL_TYPE = Word
 
 	def __init__(self, role, has_focus=False, child=None):
@@ -587,11 +688,18 @@ class RolePath(UslPath):
 
 		self.has_focus = has_focus
 
-	def as_constant(self, u=None):
+	def _fields(self):
+		return self.role, self.has_focus
+
+	def _eq_fields(self):
+		return self.role.key, self.has_focus
+
+	def _as_constant(self, u):
 		return RolePath(role=self.role,
 						has_focus=self.has_focus,
 						child=(None if self.child is None else self.child.as_constant(u)))
-	def without_morpheme(self):
+
+	def _without_morpheme(self):
 		return RolePath(role=self.role,
 						has_focus=self.has_focus,
 						child=(None if self.child is None else self.child.without_morpheme()))
@@ -685,17 +793,29 @@ class RolePath(UslPath):
 					context_type=ctx_type)
 
 
-# @monitor_decorator('usl_from_path_values')
-def usl_from_path_values(paths_values):
-	from ieml.usl.decoration.parser.parser import PathParser
-	from ieml.usl.parser import IEMLParser
+def _parse_value(value):
+	"""The value of a path as it is read from its string: an USL of one morpheme is this morpheme"""
+	from ieml.usl.parser import SinglePassParser
+
+	return SinglePassParser().parse(value)
+
+
+def _group_paths_values(paths_values, values=None):
+	"""
+	Group the values by path, then the paths by node in a prefix tree. A bin of the tree has the 'type' of the paths
+	of its children, a child bin by child path node, and the 'node' values if a path ends at this bin.
 
-	path_parser = PathParser()
-	usl_parser = IEMLParser()
+	:param paths_values: the list of (path, value)
+	:param values: if not None, a dict value string -> parsed value, filled with the values parsed
+	"""
+	if values is None:
+		values = {}
 
-	path_to_value = {path_parser.parse(p): set() for p, _ in paths_values}
+	path_to_value = {}
 	for p, v in paths_values:
-		path_to_value[path_parser.parse(p)].add(usl_parser.parse(v))
+		if v not in values:
+			values[v] = _parse_value(v)
+		path_to_value.setdefault(path(p), set()).add(values[v])
 
 	Tree = lambda: defaultdict(Tree)
 	bins = Tree()
@@ -714,19 +834,71 @@ def usl_from_path_values(paths_values):
 		else:
 			recursive_group_by(bin[p_cloned], path.child, values)
 
-	def build_nodes(bin):
-		if 'node' not in bin:
-			path_to_node = {}
-			for p, bin_child in bin.items():
-				if isinstance(p, UslPath):
-					path_to_node[p] = build_nodes(bin_child)
+	for p, values in path_to_value.items():
+		recursive_group_by(bins, p, values)
 
-			assert 'type' in bin
-			bin['node'] = bin['type'].build_usl_from_path_to_node(path_to_node)
+	return bins
 
-		return bin['node']
 
-	for p, values in path_to_value.items():
-		recursive_group_by(bins, p, list(values))
+class PathValuesBuilder:
+	"""
+	Build the USLs of lists of (path, value) that share a constant part. The constant part is grouped once, and
+	its sub-structures that a list does not change are built once and shared by all the USLs.
+	"""
+	def __init__(self, constant_paths_values=()):
+		# value string -> parsed value, the values are parsed once by builder
+		self._values = {}
+		self.constant = _group_paths_values(constant_paths_values, self._values)
+		# id of a bin of the constant tree -> its node
+		self._nodes = {}
+
+	def build(self, paths_values) -> USL:
+		"""The USL of the constant part and the paths_values, as usl_from_path_values(constant + paths_values)"""
+		return self._build_nodes(self.constant, _group_paths_values(paths_values, self._values))
+
+	def build_many(self, paths_values_list) -> List[USL]:
+		return [self.build(paths_values) for paths_values in paths_values_list]
+
+	def _build_nodes(self, bin, bin_var=None):
+		"""The node of a bin of the constant tree, merged with the bin at the same path of the list if any"""
+		if not bin_var:
+			if id(bin) not in self._nodes:
+				self._nodes[id(bin)] = self._merge_nodes(bin, None)
+			return self._nodes[id(bin)]
+
+		return self._merge_nodes(bin, bin_var)
+
+	def _merge_nodes(self, bin, bin_var):
+		bins = [b for b in (bin, bin_var) if b]
+		if any('node' in b for b in bins):
+			values = set()
+			for b in bins:
+				values.update(b.get('node', ()))
+			return list(values)
+
+		if len(bins) == 2 and not issubclass(bin_var['type'], bin['type']):
+			raise ValueError("Inconsistent path system")
+
+		path_to_node = {}
+		for p in chain.from_iterable(bins):
+			if isinstance(p, UslPath) and p not in path_to_node:
+				path_to_node[p] = self._build_nodes(bin.get(p) if bin else None, bin_var.get(p) if bin_var else None)
+
+		assert bins and 'type' in bins[0]
+		return bins[0]['type'].build_usl_from_path_to_node(path_to_node)
+
+
+# @monitor_decorator('usl_from_path_values')
+def usl_from_path_values(paths_values):
+	return PathValuesBuilder().build(paths_values)
+
+
+def usls_from_path_values(paths_values_list, constant_paths_values=()) -> List[USL]:
+	"""
+	Build many USLs at once from lists of (path, value) that share a constant part.
 
-	return build_nodes(bins)
\ No newline at end of file
+	:param paths_values_list: an iterable of lists of (path, value)
+	:param constant_paths_values: the (path, value) shared by all the USLs
+	:return: the list of usl_from_path_values(constant_paths_values + paths_values) for each paths_values
+	"""
+	return PathValuesBuilder(constant_paths_values).build_many(paths_values_list)
@@ -0,0 +1 @@
+from .proximity import ProximityEngine, DEFAULT_RELATION_WEIGHTS
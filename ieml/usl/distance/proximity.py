@@ -0,0 +1,272 @@
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+from scipy.sparse.csr import csr_matrix
+from scipy.sparse.construct import diags
+
+from ieml.constants import RELATIONS
+from ieml.dictionary.script import Script
+from ieml.usl.usl import USL, usl as _usl
+
+
+# weight of each relation type in the adjacency of the random walk
+DEFAULT_RELATION_WEIGHTS = {
+    'contains': 1.0,
+    'contained': 1.0,
+    'father_substance': 1.0,
+    'child_substance': 1.0,
+    'father_attribute': 0.5,
+    'child_attribute': 0.5,
+    'father_mode': 0.25,
+    'child_mode': 0.25,
+    'opposed': 1.0,
+    'associated': 1.0,
+    'crossed': 1.0,
+    'twin': 1.0,
+    'table_0': 0.1,
+    'table_1': 0.1,
+    'table_2': 0.2,
+    'table_3': 0.4,
+    'table_4': 0.6,
+    'table_5': 0.8,
+    'identity': 0.0,
+}
+
+# number of morphemes whose random walks are iterated together
+PAGERANK_BATCH_SIZE = 256
+
+
+class ProximityEngine:
+    """
+    Semantic proximity between the USLs, computed from the relations graph of the dictionary.
+
+    Each morpheme is represented by its personalized PageRank vector on the weighted relations adjacency (the
+    stationary distribution of a random walk that restarts on the morpheme with probability alpha), cached once
+    computed. An USL is represented by the mean of the vectors of its morphemes, and the proximity of two USLs is
+    the cosine similarity of their vectors.
+    """
+    def __init__(self, dictionary, weights: Dict[str, float]=None, alpha: float=0.15, tol: float=1e-6,
+                 max_iter: int=100):
+        """
+        :param dictionary: the dictionary
+        :param weights: a dict relation type -> weight, missing relation types are ignored, DEFAULT_RELATION_WEIGHTS
+        if None
+        :param alpha: the restart probability of the random walk
+        :param tol: the convergence tolerance (l1 norm) of the power iteration
+        :param max_iter: the maximum number of iterations of the power iteration
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("Invalid restart probability {}, expected a value in ]0, 1]".format(alpha))
+
+        self.dictionary = dictionary
+        self.weights = dict(DEFAULT_RELATION_WEIGHTS if weights is None else weights)
+
+        missing = [r for r in self.weights if r not in RELATIONS]
+        if missing:
+            raise ValueError("Invalid relations : {%s}" % ", ".join(missing))
+
+        self.alpha = alpha
+        self.tol = tol
+        self.max_iter = max_iter
+
+        self._adjacency = None
+        self._transition = None
+        self._dangling = None
+
+        # morpheme -> personalized PageRank vector
+        self._vectors = {}
+
+    @property
+    def adjacency(self) -> csr_matrix:
+        """
+        :return: the csr_matrix (len(dictionary), len(dictionary)) of the weighted sum of the relations matrices
+        """
+        if self._adjacency is None:
+            n = len(self.dictionary.scripts)
+            adjacency = csr_matrix((n, n), dtype=float)
+            for reltype, weight in self.weights.items():
+                if weight:
+                    adjacency = adjacency + weight * csr_matrix(self.dictionary.relations.relations[reltype],
+                                                                dtype=float)
+
+            adjacency.eliminate_zeros()
+            self._adjacency = adjacency
+
+        return self._adjacency
+
+    @property
+    def transition(self) -> csr_matrix:
+        """
+        :return: the transposed, row normalized, weighted adjacency (m[j, i] is the probability of the step i -> j)
+        """
+        if self._transition is None:
+            out_weights = np.asarray(self.adjacency.sum(axis=1)).ravel()
+            self._dangling = out_weights == 0
+            out_weights[self._dangling] = 1.0
+
+            self._transition = csr_matrix(diags(1.0 / out_weights).dot(self.adjacency).transpose())
+
+        return self._transition
+
+    def morpheme_vectors(self, morphemes: Iterable[Script]) -> np.ndarray:
+        """
+        The personalized PageRank vectors of the morphemes. The morphemes that are not in the dictionary restart on
+        their singular sequences.
+
+        :param morphemes: an iterable of scripts
+        :return: a np.array (len(morphemes), len(dictionary)) of float
+        """
+        morphemes = list(morphemes)
+
+        missing = list({m for m in morphemes if m not in self._vectors})
+        for i in range(0, len(missing), PAGERANK_BATCH_SIZE):
+            batch = missing[i:i + PAGERANK_BATCH_SIZE]
+            for m, vector in zip(batch, self._personalized_pagerank(batch).T):
+                self._vectors[m] = vector
+
+        if not morphemes:
+            return np.zeros((0, len(self.dictionary.scripts)))
+
+        return np.stack([self._vectors[m] for m in morphemes])
+
+    def morpheme_proximity(self, m0: Script, m1: Script) -> float:
+        """
+        :return: the probability to be on a random walk restarting on m0 in m1
+        """
+        v0, = self.morpheme_vectors([m0])
+        return float(v0[self._restart_indexes(m1)].sum())
+
+    def usl_vectors(self, usls: Iterable[Union[str, Script, USL]]) -> np.ndarray:
+        """
+        :param usls: an iterable of USLs (or of scripts or strings, casted with ieml.usl.usl)
+        :return: a np.array (len(usls), len(dictionary)) of the l2 normalized mean of the morphemes vectors
+        """
+        weights, morphemes = self._morphemes_weights(usls)
+        vectors = weights.dot(self.morpheme_vectors(morphemes))
+
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1.0
+        return vectors / norms[:, np.newaxis]
+
+    def proximity(self, u0: Union[str, Script, USL], u1: Union[str, Script, USL]) -> float:
+        """
+        :return: the cosine similarity in [0, 1] of the two USLs vectors
+        """
+        return float(self.scores([u0], [u1])[0, 0])
+
+    def scores(self, queries: Iterable[Union[str, Script, USL]],
+               candidates: Iterable[Union[str, Script, USL]]) -> np.ndarray:
+        """
+        The USLs proximity between each query and each candidate. The morphemes vectors are only combined through
+        their Gram matrix, the USLs vectors are never built.
+
+        :param queries: an iterable of USLs
+        :param candidates: an iterable of USLs
+        :return: a np.array (len(queries), len(candidates)) of the cosine similarities
+        """
+        queries, candidates = list(queries), list(candidates)
+
+        weights, morphemes = self._morphemes_weights(queries + candidates)
+        vectors = self.morpheme_vectors(morphemes)
+        gram = vectors.dot(vectors.T)
+
+        # q[i] . c[j] = w_q[i] G w_c[j]^T
+        products = np.asarray(weights.dot(gram))
+        norms = np.sqrt(np.maximum(np.asarray(weights.multiply(products).sum(axis=1)).ravel(), 0))
+        norms[norms == 0] = 1.0
+
+        q, c = slice(0, len(queries)), slice(len(queries), len(queries) + len(candidates))
+        scores = np.asarray(weights[c].dot(products[q].T)).T
+        return scores / norms[q, np.newaxis] / norms[np.newaxis, c]
+
+    def nearest(self, queries: Iterable[Union[str, Script, USL]], candidates: Iterable[Union[str, Script, USL]],
+                k: int=10, exclude_self: bool=True) -> List[List[Tuple[USL, float]]]:
+        """
+        The k nearest candidates of each query.
+
+        :param queries: an iterable of USLs
+        :param candidates: an iterable of USLs
+        :param k: the number of candidates to return for each query
+        :param exclude_self: if True, a query is never returned as one of its nearest candidates
+        :return: for each query, the list of at most k (candidate, score) by decreasing score (by candidate order for
+        the same score)
+        """
+        queries = [_usl(u) for u in queries]
+        candidates = [_usl(u) for u in candidates]
+        if not queries:
+            return []
+
+        scores = self.scores(queries, candidates)
+
+        if exclude_self:
+            candidates_idx = {}
+            for j, c in enumerate(candidates):
+                candidates_idx.setdefault(c, []).append(j)
+
+            for i, q in enumerate(queries):
+                scores[i, candidates_idx.get(q, [])] = -np.inf
+
+        k = min(k, len(candidates))
+        if k <= 0:
+            return [[] for _ in queries]
+
+        # the k largest scores, then sorted by decreasing score and candidate index
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        res = []
+        for i, row in enumerate(top):
+            row = sorted(row, key=lambda j: (-scores[i, j], j))
+            res.append([(candidates[j], float(scores[i, j])) for j in row if scores[i, j] != -np.inf])
+
+        return res
+
+    def _restart_indexes(self, morpheme):
+        if morpheme in self.dictionary.index:
+            return [self.dictionary.index[morpheme]]
+
+        return [self.dictionary.index[ss] for ss in morpheme.singular_sequences if ss in self.dictionary.index]
+
+    def _morphemes_weights(self, usls):
+        """
+        :return: a csr_matrix (len(usls), len(morphemes)) of the weight of each morpheme in each USL and the list of
+        the morphemes
+        """
+        usls = list(usls)
+
+        morphemes_idx = {}
+        rows, cols, values = [], [], []
+        for i, u in enumerate(usls):
+            morphemes = [m for m in _usl(u).morphemes if not m.empty]
+            for m in morphemes:
+                rows.append(i)
+                cols.append(morphemes_idx.setdefault(m, len(morphemes_idx)))
+                values.append(1.0 / len(morphemes))
+
+        morphemes = sorted(morphemes_idx, key=morphemes_idx.get)
+        return csr_matrix((values, (rows, cols)), shape=(len(usls), len(morphemes))), morphemes
+
+    def _personalized_pagerank(self, morphemes):
+        """
+        Power iteration of the random walks restarting on each morpheme, the walks that reach a script without
+        relation also restart.
+
+        :return: a np.array (len(dictionary), len(morphemes)), a column by morpheme
+        """
+        transition = self.transition
+
+        restart = np.zeros((transition.shape[0], len(morphemes)))
+        for j, m in enumerate(morphemes):
+            indexes = self._restart_indexes(m)
+            if indexes:
+                restart[indexes, j] = 1.0 / len(indexes)
+
+        vectors = restart
+        for _ in range(self.max_iter):
+            walk = transition.dot(vectors) + restart * vectors[self._dangling].sum(axis=0)
+            next_vectors = (1 - self.alpha) * walk + self.alpha * restart
+
+            delta = np.abs(next_vectors - vectors).sum(axis=0).max()
+            vectors = next_vectors
+            if delta < self.tol:
+                break
+
+        return vectors
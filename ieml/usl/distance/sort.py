@@ -1,5 +1,7 @@
 import numpy as np
 
+from ieml.usl.usl import USL
+
 
 def square_order_matrix(usl_list):
     """
@@ -31,11 +33,11 @@ class QuerySort:
     def __init__(self, usl):
         self.usl = usl
 
-        assert isinstance(usl, Usl)
+        assert isinstance(usl, USL)
 
     def sort(self, collection):
         def sort_key(u):
-            return self._proximity(u, lambda u: u.semes)
+            return self._proximity(u, lambda u: set(u.morphemes))
             # self._proximity(u, lambda u: u.topics)
 
         return sorted(collection, key=sort_key)
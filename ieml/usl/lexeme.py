@@ -1,14 +1,29 @@
-import itertools
-from ieml.usl import USL, PolyMorpheme, check_polymorpheme
+from ieml.commons import ProductSequence
+from ieml.usl import USL, PolyMorpheme
+from ieml.usl.polymorpheme import iter_polymorpheme_errors
 
 
 def check_lexeme(lexeme, sfun=None):
+	for _, message in iter_lexeme_errors(lexeme, sfun=sfun):
+		raise ValueError(message)
+
+
+def iter_lexeme_errors(lexeme, sfun=None, iter_pm_errors=iter_polymorpheme_errors):
+	"""
+	Yield every violation of the lexeme checks.
+
+	:param lexeme: the lexeme
+	:param sfun: the syntagmatic function of the lexeme
+	:param iter_pm_errors: the function that yields the violations of the polymorphemes
+	:return: an iterator of (component, error message)
+	"""
 	for pm in [lexeme.pm_flexion, lexeme.pm_content]:
 		if not isinstance(pm, PolyMorpheme):
-			raise ValueError("Invalid arguments to create a Lexeme, expects a Polymorpheme, not a {}."
-							 .format(pm.__class__.__name__))
+			yield str(pm), "Invalid arguments to create a Lexeme, expects a Polymorpheme, not a {}."\
+				.format(pm.__class__.__name__)
+			continue
 
-		check_polymorpheme(pm)
+		yield from iter_pm_errors(pm)
 
 	# check_lexeme_scripts(lexeme.pm_flexion.constant,
 	#                      lexeme.pm_content.constant,
@@ -17,6 +32,7 @@ def check_lexeme(lexeme, sfun=None):
 
 class Lexeme(USL):
 	"""A lexeme without the PA of the position on the tree (position independant lexeme)"""
+	__slots__ = ('pm_flexion', 'pm_content')
 
 	syntactic_level = 2
 
@@ -30,15 +46,14 @@ class Lexeme(USL):
 		# self.address = PolyMorpheme(constant=[m for m in pm_address.constant if m in ADDRESS_SCRIPTS])
 		self.grammatical_class = self.pm_content.grammatical_class
 
-		self._str = []
+	def _render(self):
+		res = []
 		for pm in [self.pm_content, self.pm_flexion]:
-			if not self._str and pm.empty:
+			if not res and pm.empty:
 				continue
-			self._str.append("({})".format(str(pm)))
+			res.append("({})".format(str(pm)))
 
-		self._str = ''.join(reversed(self._str))
-		if not self._str:
-			self._str = "()"
+		return ''.join(reversed(res)) or "()"
 
 	def check(self):
 		pass
@@ -49,7 +64,7 @@ class Lexeme(USL):
 		yield self.pm_content
 		yield from self.pm_content.iter_structure()
 
-	def iter_structure_path(self, flexion=False):
+	def _iter_structure_path(self, flexion=False):
 		from ieml.usl.decoration.path import LexemePath, LexemeIndex
 		from ieml.usl.decoration.path import FlexionPath
 
@@ -73,6 +88,9 @@ class Lexeme(USL):
 			   (self.pm_flexion == other.pm_flexion and self.pm_content < other.pm_content)
 
 
+	def _compute_order_key(self):
+		return self.pm_flexion.order_key, self.pm_content.order_key
+
 	def _compute_singular_sequences(self):
 		if self.pm_flexion.is_singular and (self.pm_content is None or self.pm_content.is_singular):
 			return [self]
@@ -81,9 +99,22 @@ class Lexeme(USL):
 						self.pm_content]
 			_product = [p.singular_sequences for p in _product if p is not None]
 
-			return [Lexeme(*ss)
-					for ss in itertools.product(*_product)]
+			return ProductSequence(_product,
+								   build=lambda ss: Lexeme(*ss),
+								   decompose=lambda l: (l.pm_flexion, l.pm_content) if isinstance(l, Lexeme) else None)
+
+
+	@property
+	def cardinal(self):
+		return self.pm_flexion.cardinal * self.pm_content.cardinal
+
+	def _singular_sequence_at(self, i):
+		if self.is_singular:
+			return self
 
+		flexion_i, content_i = divmod(i, self.pm_content.cardinal)
+		return Lexeme(self.pm_flexion._singular_sequence_at(flexion_i),
+					  self.pm_content._singular_sequence_at(content_i))
 
 	@property
 	def morphemes(self):
@@ -1 +1,3 @@
-from .parser import IEMLParser
\ No newline at end of file
+from .parser import IEMLParser
+from .single_pass import SinglePassParser
+from .stream import iter_parse_file
@@ -36,31 +36,50 @@ tokens = (
 )
 
 
+# the regex of the string rules of the lexer, by token name
+TOKEN_REGEXES = {
+    'OLD_MORPHEME_GRAMMATICAL_CLASS': r'E:\.b\.E:[SBT]:\.-',
+    'MORPHEME': TERM_REGEX,
+    'LPAREN': r'\(',
+    'RPAREN': r'\)',
+    'RCHEVRON': r'\>',
+    'LBRACKET': r'\[',
+    'RBRACKET': r'\]',
+    'EXCLAMATION_MARK': r'\!',
+    'LITERAL': r'\#(\\\#|[^\#])+\#',
+    'GROUP_MULTIPLICITY': r'm\d+',
+    'USL_PATH': r'(?<=\[)>(role>{role_regex}(\s{role_regex})*>)?((flexion|content)>)?(((group_\d|constant)>)?{term_regex})?'\
+        .format(role_regex=ROLE_REGEX, term_regex=TERM_REGEX),
+    'DECORATION_VALUE': r'"(\\"|[^"])*"',
+}
+
+IGNORED_CHARACTERS = '{} \t\n'
+
+
 def get_lexer(module=None):
-    t_OLD_MORPHEME_GRAMMATICAL_CLASS = r'E:\.b\.E:[SBT]:\.-'
+    t_OLD_MORPHEME_GRAMMATICAL_CLASS = TOKEN_REGEXES['OLD_MORPHEME_GRAMMATICAL_CLASS']
 
-    t_MORPHEME = TERM_REGEX
+    t_MORPHEME = TOKEN_REGEXES['MORPHEME']
     # t_PLUS   = r'\+'
     # t_TIMES   = r'\*'
-    t_LPAREN  = r'\('
-    t_RPAREN  = r'\)'
+    t_LPAREN  = TOKEN_REGEXES['LPAREN']
+    t_RPAREN  = TOKEN_REGEXES['RPAREN']
     # t_LCHEVRON = r'\<'
-    t_RCHEVRON = r'\>'
+    t_RCHEVRON = TOKEN_REGEXES['RCHEVRON']
 
-    t_LBRACKET = r'\['
-    t_RBRACKET  = r'\]'
-    t_EXCLAMATION_MARK  = r'\!'
+    t_LBRACKET = TOKEN_REGEXES['LBRACKET']
+    t_RBRACKET  = TOKEN_REGEXES['RBRACKET']
+    t_EXCLAMATION_MARK  = TOKEN_REGEXES['EXCLAMATION_MARK']
     #
 
-    t_LITERAL = r'\#(\\\#|[^\#])+\#'
+    t_LITERAL = TOKEN_REGEXES['LITERAL']
 
-    t_GROUP_MULTIPLICITY = r'm\d+'
-    t_USL_PATH = r'(?<=\[)>(role>{role_regex}(\s{role_regex})*>)?((flexion|content)>)?(((group_\d|constant)>)?{term_regex})?'.format(role_regex=ROLE_REGEX,
-                                                                                                                        term_regex=TERM_REGEX)
+    t_GROUP_MULTIPLICITY = TOKEN_REGEXES['GROUP_MULTIPLICITY']
+    t_USL_PATH = TOKEN_REGEXES['USL_PATH']
 
-    t_DECORATION_VALUE = r'"(\\"|[^"])*"'
+    t_DECORATION_VALUE = TOKEN_REGEXES['DECORATION_VALUE']
 
-    t_ignore  = '{} \t\n'
+    t_ignore  = IGNORED_CHARACTERS
 
     # Error handling rule
     def t_error(t):
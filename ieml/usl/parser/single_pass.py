@@ -0,0 +1,277 @@
+import logging
+import re
+
+from ieml.dictionary.script import script, Script, NullScript
+from ieml.exceptions import CannotParse
+from ieml.usl import Word, PolyMorpheme, USL
+from ieml.usl.lexeme import Lexeme
+from ieml.usl.syntagmatic_function import SyntagmaticFunction, SyntagmaticRole
+from .lexer import TOKEN_REGEXES, IGNORED_CHARACTERS
+
+from ..decoration.instance import Decoration, InstancedUSL
+from ..decoration.parser.parser import parse_path
+
+logger = logging.getLogger(__name__)
+
+
+# the rules are tried in the order of the ply lexer: by decreasing length of their regex
+TOKEN_RE = re.compile('|'.join('(?P<{}>{})'.format(name, regex) for name, regex in
+                               sorted(TOKEN_REGEXES.items(), key=lambda e: len(e[1]), reverse=True)), re.VERBOSE)
+
+def tokenize(s):
+    """
+    Split a string into the tokens of the USL lexer (ieml.usl.parser.lexer), the ignored and illegal characters are
+    skipped.
+
+    :param s: the string to tokenize
+    :return: the list of (token type, value, position)
+    """
+    res = []
+    pos = 0
+    while pos < len(s):
+        if s[pos] in IGNORED_CHARACTERS:
+            pos += 1
+            continue
+
+        m = TOKEN_RE.match(s, pos)
+        if m is None:
+            logger.log(logging.ERROR, "Illegal character '%s'" % s[pos])
+            pos += 1
+            continue
+
+        res.append((m.lastgroup, m.group(), pos))
+        pos = m.end()
+
+    return res
+
+# the tokens that can follow a morpheme in the LALR table of IEMLParser, None for the end of the string. IEMLParser
+# raises a syntax error on the other tokens before it builds the morpheme.
+MORPHEME_LOOKAHEADS = {None, 'GROUP_MULTIPLICITY', 'LBRACKET', 'LPAREN', 'MORPHEME', 'RPAREN'}
+
+# number of morphemes memoized by string, for the parsers without dictionary
+MORPHEME_CACHE_SIZE = 10000
+
+# (morpheme string, factorize) -> script. The lookups take no lock, only the misses go through the locked ScriptParser.
+_morphemes_cache = {}
+
+
+def cached_morpheme(s, factorize=False):
+    """
+    The script of a morpheme string, from a bounded cache shared by the parsers. Once the cache is full, the new
+    morphemes are parsed but not memoized.
+
+    :param s: the morpheme string
+    :param factorize: if the script is factorized
+    :return: the script
+    """
+    key = (s, factorize)
+    try:
+        return _morphemes_cache[key]
+    except KeyError:
+        pass
+
+    morpheme = script(s, factorize=factorize)
+    if len(_morphemes_cache) < MORPHEME_CACHE_SIZE:
+        _morphemes_cache[key] = morpheme
+    return morpheme
+
+
+class SinglePassParser:
+    """
+    A recursive descent parser of the grammar of IEMLParser. The string is read once and each node of the AST is
+    built once, from the lists of its morphemes. The parser holds no state between the calls to parse, an instance
+    can be shared between threads without lock. The morphemes are looked up in the index of the dictionary if any,
+    else in the cache of cached_morpheme.
+    """
+    def __init__(self, dictionary=None):
+        self.dictionary = dictionary
+
+        # the morphemes of the dictionary by their string
+        self._morphemes = None
+        if dictionary is not None:
+            self._morphemes = {str(s): s for s in dictionary.index}
+
+    def parse(self, s, factorize_script=False):
+        """Parses the input string, and returns a reference to the created AST's root"""
+        if s == '':
+            return NullScript(0)
+
+        if isinstance(s, (USL, Script)):
+            s = str(s)
+
+        try:
+            return _Parse(self, tokenize(s), factorize_script).proposition()
+        except ValueError as e:
+            raise CannotParse(s, str(e))
+        except CannotParse as e:
+            e.s = s
+            raise e
+
+    def morpheme(self, s, factorize_script=False):
+        if self._morphemes is not None and not factorize_script and s in self._morphemes:
+            return self._morphemes[s]
+
+        morpheme = cached_morpheme(s, factorize=factorize_script)
+
+        if self.dictionary is not None and morpheme not in self.dictionary:
+            raise ValueError("Morpheme {} not defined in dictionary".format(morpheme))
+
+        return morpheme
+
+
+class _Parse:
+    """The state of the parsing of a string: the tokens and the position of the next one."""
+    __slots__ = ('parser', 'tokens', 'i', 'factorize_script')
+
+    def __init__(self, parser: SinglePassParser, tokens, factorize_script):
+        self.parser = parser
+        self.tokens = tokens
+        self.i = 0
+        self.factorize_script = factorize_script
+
+    def peek(self):
+        if self.i < len(self.tokens):
+            return self.tokens[self.i][0]
+        return None
+
+    def next(self, type):
+        if self.peek() != type:
+            self.error()
+
+        self.i += 1
+        return self.tokens[self.i - 1][1]
+
+    def error(self):
+        if self.i < len(self.tokens):
+            _, value, pos = self.tokens[self.i]
+            msg = "Syntax error at '%s' (%d, %d)" % (value, 1, pos)
+        else:
+            msg = "Syntax error at EOF"
+
+        raise CannotParse(None, msg)
+
+    def proposition(self):
+        if len(self.tokens) == 1 and self.peek() == 'MORPHEME':
+            return self.morpheme()
+
+        u = self.usl()
+        if self.peek() is None:
+            return u
+
+        decorations = []
+        while True:
+            self.next('LBRACKET')
+            path = parse_path(self.next('USL_PATH'))
+            value = self.next('DECORATION_VALUE')
+            self.next('RBRACKET')
+            decorations.append(Decoration(path, value[1:-1]))
+
+            if self.peek() is None:
+                return InstancedUSL(u, decorations)
+
+    def usl(self):
+        type = self.peek()
+        if type in ('MORPHEME', 'GROUP_MULTIPLICITY'):
+            return PolyMorpheme(*self.poly_morpheme())
+        elif type == 'LPAREN':
+            return self.lexeme()
+        elif type == 'LBRACKET':
+            return self.word()
+
+        self.error()
+
+    def morpheme(self):
+        value = self.next('MORPHEME')
+        if self.peek() not in MORPHEME_LOOKAHEADS:
+            self.error()
+
+        return self.parser.morpheme(value, factorize_script=self.factorize_script)
+
+    def morpheme_sum(self):
+        morphemes = []
+        while self.peek() == 'MORPHEME':
+            morphemes.append(self.morpheme())
+        return morphemes
+
+    def poly_morpheme(self):
+        """:return: the constant and the groups of the polymorpheme"""
+        constant = self.morpheme_sum()
+
+        groups = []
+        while self.peek() == 'GROUP_MULTIPLICITY':
+            multiplicity = int(self.next('GROUP_MULTIPLICITY')[1:])
+            self.next('LPAREN')
+            group = [self.morpheme()] + self.morpheme_sum()
+            self.next('RPAREN')
+            groups.append((group, multiplicity))
+
+        return constant, groups
+
+    def lexeme(self):
+        if self.peek() != 'LPAREN':
+            self.error()
+
+        # the polymorphemes between the parenthesis, None if empty
+        pms = []
+        while len(pms) < 3 and self.peek() == 'LPAREN':
+            self.i += 1
+            if self.peek() == 'RPAREN':
+                # only the first two polymorphemes can be empty, if the previous ones are empty
+                if len(pms) == 2 or any(pm is not None for pm in pms):
+                    self.error()
+                pms.append(None)
+            else:
+                pms.append(self.poly_morpheme())
+
+            self.next('RPAREN')
+
+        if pms == [None, None]:
+            # ()() expects a third polymorpheme
+            self.error()
+
+        empty = PolyMorpheme(constant=[])
+        if len(pms) == 3:
+            flexion = pms[2] if pms[0] is None else (pms[0][0] + pms[2][0], pms[0][1] + pms[2][1])
+            return Lexeme(pm_flexion=PolyMorpheme(*flexion),
+                          pm_content=empty if pms[1] is None else PolyMorpheme(*pms[1]))
+        elif len(pms) == 2:
+            return Lexeme(pm_flexion=empty if pms[0] is None else PolyMorpheme(*pms[0]),
+                          pm_content=PolyMorpheme(*pms[1]))
+        else:
+            return Lexeme(pm_flexion=empty if pms[0] is None else PolyMorpheme(*pms[0]),
+                          pm_content=empty)
+
+    def word(self):
+        self.next('LBRACKET')
+        if self.peek() == 'OLD_MORPHEME_GRAMMATICAL_CLASS':
+            self.i += 1
+
+        lex_list = []
+        role = None
+        while True:
+            focus = self.peek() == 'EXCLAMATION_MARK'
+            if focus:
+                self.i += 1
+
+            positioned_lexeme = self.morpheme_sum(), self.lexeme()
+            lex_list.append(positioned_lexeme)
+            if focus:
+                role = positioned_lexeme[0]
+
+            if self.peek() != 'RCHEVRON':
+                break
+            self.i += 1
+
+        self.next('RBRACKET')
+        # as IEMLParser, a syntax error after the word is raised before the checks of the word
+        if self.peek() not in (None, 'LBRACKET'):
+            self.error()
+
+        if not role:
+            raise ValueError("No role specified in the syntagmatic function to build a word.")
+
+        ctx_type, sfun = SyntagmaticFunction.from_list(lex_list)
+
+        return Word(syntagmatic_fun=sfun,
+                    role=SyntagmaticRole(constant=role),
+                    context_type=ctx_type)
@@ -0,0 +1,89 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, Tuple, Union
+
+from ieml.exceptions import CannotParse
+from ieml.usl import USL, Word, check_word
+from .single_pass import SinglePassParser
+from ..decoration.instance import InstancedUSL
+
+# number of lines sent at once to a worker process
+PARSE_CHUNK_SIZE = 1024
+
+# number of chunks submitted by worker process before their results are read
+PARSE_CHUNKS_AHEAD = 2
+
+
+def _iter_lines(path, comment=None):
+    """Yield the (line number, USL string) of the non empty lines of the file, starting at 1."""
+    with open(path) as fp:
+        for line_no, line in enumerate(fp, 1):
+            if comment is not None:
+                line = line.split(comment, 1)[0]
+
+            line = line.strip()
+            if line:
+                yield line_no, line
+
+
+def _parse_line(parser, s, check):
+    try:
+        u = parser.parse(s)
+        w = u.usl if isinstance(u, InstancedUSL) else u
+        if check and isinstance(w, Word):
+            check_word(w)
+        return u
+    except CannotParse as e:
+        # the string is not in the arguments of the error raised by the parser, they are pickled
+        return CannotParse(s, e.msg)
+    except ValueError as e:
+        return e
+
+
+_parse_worker = {}
+
+
+def _init_parse_worker(check):
+    _parse_worker['parser'] = SinglePassParser()
+    _parse_worker['check'] = check
+
+
+def _parse_chunk_worker(chunk):
+    return [(line_no, _parse_line(_parse_worker['parser'], s, _parse_worker['check'])) for line_no, s in chunk]
+
+
+def iter_parse_file(path: str, workers: int=None, chunk_size: int=PARSE_CHUNK_SIZE, check: bool=False,
+                    comment: str=None) -> Iterator[Tuple[int, Union[USL, Exception]]]:
+    """
+    Parse a file with an USL by line. The file is read lazily and at most PARSE_CHUNKS_AHEAD chunks by worker are
+    in memory at once, so the file can be larger than the memory. The empty lines are skipped.
+
+    :param path: the path of the file
+    :param workers: if greater than 1, the number of processes that parse the lines
+    :param chunk_size: the number of lines sent at once to a process
+    :param check: if True, the parsed words (instanced or not) are checked with ieml.usl.check_word
+    :param comment: if not None, the part of the lines after this string is ignored
+    :return: an iterator of (line number, USL or the CannotParse/ValueError of the line), in the order of the file
+    """
+    lines = _iter_lines(path, comment=comment)
+
+    if workers is None or workers <= 1:
+        parser = SinglePassParser()
+        for line_no, s in lines:
+            yield line_no, _parse_line(parser, s, check)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker, initargs=(check,)) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < workers * PARSE_CHUNKS_AHEAD:
+                chunk = list(islice(lines, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_parse_chunk_worker, chunk))
+
+            if not pending:
+                return
+
+            yield from pending.popleft().result()
@@ -13,13 +13,20 @@ def check_phrase(w):
 
 class Phrase(USL):
     """(character*character*character)"""
+    __slots__ = ('substance', 'attribute', 'mode')
+
     def __init__(self, substance: Word, attribute: Word, mode: Word):
         super().__init__()
 
         self.substance = substance
         self.attribute = attribute
         self.mode = mode
-        self._str = '({})'.format("*".join([str(self.substance), str(self.attribute), str(self.mode)]))
+
+    def _render(self):
+        return '({})'.format("*".join([str(self.substance), str(self.attribute), str(self.mode)]))
+
+    def _compute_key(self):
+        return self.substance.key, self.attribute.key, self.mode.key
 
     @property
     def empty(self):
@@ -1,4 +1,5 @@
 from itertools import product, combinations, chain, count
+from math import comb
 
 from collections import defaultdict
 from typing import List
@@ -13,41 +14,59 @@ from ieml.usl.variation import PolyMorphemeVariation
 
 
 def check_polymorpheme(ms):
+    for _, message in iter_polymorpheme_errors(ms):
+        raise ValueError(message)
+
+
+def iter_polymorpheme_errors(ms):
+    """
+    Yield every violation of the polymorpheme checks. If the constant or the groups are not made of morphemes, the
+    other checks are not run.
+
+    :param ms: the polymorpheme
+    :return: an iterator of (polymorpheme, error message)
+    """
     from ieml.usl.decoration.instance import InstancedUSL
     if isinstance(ms, InstancedUSL):
         ms = ms.usl
 
+    errors = []
+
     if not all(isinstance(s, Script) for s in ms.constant):
-        raise ValueError("A polymorpheme constant must be made of morphemes")
+        errors.append("A polymorpheme constant must be made of morphemes")
 
     if not all(isinstance(g[0], tuple) and all(isinstance(gg, Script) for gg in g[0])
                and isinstance(g[1], int) for g in ms.groups):
-        raise ValueError("A trait group must be made of a list of (Morpheme list, multiplicity)")
+        errors.append("A trait group must be made of a list of (Morpheme list, multiplicity)")
+
+    if not errors:
+        if sorted(ms.groups) != list(ms.groups):
+            errors.append("Invalid ordering of the polymorpheme groups")
 
-    if sorted(ms.groups) != list(ms.groups):
-        raise ValueError("Invalid ordering of the polymorpheme groups")
+        if any(sorted(g[0]) != list(g[0]) for g in ms.groups):
+            errors.append("Invalid ordering of the morphemes in a polymorpheme groups")
 
-    if any(sorted(g[0]) != list(g[0]) for g in ms.groups):
-        raise ValueError("Invalid ordering of the morphemes in a polymorpheme groups")
+        if any(g[0] and (int(g[1]) != g[1] or g[1] <= 0 or g[1] > POLYMORPHEME_MAX_MULTIPLICITY) for g in ms.groups):
+            errors.append("Multiplicity is not a positive integer in [1, 2, 3].")
 
-    if any(g[0] and (int(g[1]) != g[1] or g[1] <= 0 or g[1] > POLYMORPHEME_MAX_MULTIPLICITY) for g in ms.groups):
-        raise ValueError("Multiplicity is not a positive integer in [1, 2, 3].")
+        if any(g[0] and g[1] > len(g[0]) for g in ms.groups):
+            errors.append("Multiplicity is greater than the number of morphemes in the group.")
 
-    if any(g[0] and g[1] > len(g[0]) for g in ms.groups):
-        raise ValueError("Multiplicity is greater than the number of morphemes in the group.")
+        if sorted(ms.constant) != list(ms.constant):
+            errors.append("Invalid ordering of the polymorpheme constants")
 
-    if sorted(ms.constant) != list(ms.constant):
-        raise ValueError("Invalid ordering of the polymorpheme constants")
+        # compare the intersection except empty "E:"
+        all_group = [ms.constant, *(g for g, _ in ms.groups)]
+        all_morphemes = {str(w): w for g in all_group for w in g}
 
-    # compare the intersection except empty "E:"
-    all_group = [ms.constant, *(g for g, _ in ms.groups)]
-    all_morphemes = {str(w): w for g in all_group for w in g}
+        if len(all_morphemes) != sum(len(g) for g in all_group):
+            errors.append("The groups and constants must be disjoint")
 
-    if len(all_morphemes) != sum(len(g) for g in all_group):
-        raise ValueError("The groups and constants must be disjoint")
+        if any(len(m) != 1 for m in all_morphemes.values()):
+            errors.append("A polymorpheme can't be made from a morpheme paradigm.")
 
-    if any(len(m) != 1 for m in all_morphemes.values()):
-        raise ValueError("A polymorpheme can't be made from a morpheme paradigm.")
+    for message in errors:
+        yield str(ms), message
 
 
 def _filter_empty(l):
@@ -102,6 +121,29 @@ def compute_PM_singular_sequences(constants, groups):
     # C3 + C2
     # etc...
 
+    if not _disjoint(constants, groups):
+        # the same set of morphemes can be reached from different combinations, keep the last one
+        traits = LastUpdatedOrderedDict()
+        for m in _iter_PM_singular_sequences(constants, groups):
+            traits[str(m)] = m
+
+        return tuple(traits.values())
+
+    return tuple(_iter_PM_singular_sequences(constants, groups))
+
+
+def _disjoint(constants, groups):
+    all_morphemes = [*constants, *(m for g, _ in groups for m in g)]
+    return len(set(map(str, all_morphemes))) == len(all_morphemes)
+
+
+def _iter_groups_sizes(groups):
+    """
+    Iterate over the number of morphemes taken from each group by the singular sequences of the polymorpheme.
+
+    :return: an iterator of (groups indexes, sizes), the singular sequences of the block are the product of the
+    combinations of sizes[k] morphemes of the group indexes[k], in that order.
+    """
     # number of groups
     N = len(groups)
     min_len = min(map(len, list(zip(*groups))[0]))
@@ -111,44 +153,142 @@ def compute_PM_singular_sequences(constants, groups):
         for j in range(mult + 1, min_len + 1):
             max_sizes_groups[j].add(i)
 
-    def iter_groups_combinations():
-        for i in count():
-            # minimum number of elements taken from each groups
-            q = i // N
+    for i in count():
+        # minimum number of elements taken from each groups
+        q = i // N
 
-            # number of groups which will yield q + 1 elements
-            r = i % N
+        # number of groups which will yield q + 1 elements
+        r = i % N
 
-            if q == min_len + 1 or q in max_sizes_groups:
-                break
+        if q == min_len + 1 or q in max_sizes_groups:
+            break
 
-            for indexes in combinations(range(N), r):
-                if any(j in max_sizes_groups.get(q + 1, set()) for j in indexes):
-                    continue
+        for indexes in combinations(range(N), r):
+            if any(j in max_sizes_groups.get(q + 1, set()) for j in indexes):
+                continue
 
-                if any(len(groups[i][0]) <= q for i in indexes):
-                    continue
+            if any(len(groups[i][0]) <= q for i in indexes):
+                continue
 
-                yield from product(*(combinations(groups[i][0], q + 1) for i in indexes),
-                                   *(combinations(groups[i][0], q) for i in range(N) if i not in indexes))
+            others = tuple(i for i in range(N) if i not in indexes)
+            yield indexes + others, (q + 1,) * len(indexes) + (q,) * len(others)
 
-    traits = LastUpdatedOrderedDict()
 
+def _iter_PM_singular_sequences(constants, groups):
     SIZE_LIMIT = MORPHEME_SERIE_SIZE_LIMIT_CONTENT# if is_content else MORPHEME_SERIE_SIZE_LIMIT_FUNCTION
+    disjoint = _disjoint(constants, groups)
+
+    for indexes, sizes in _iter_groups_sizes(groups):
+        # with disjoint groups, all the singular sequences of a block have the same size
+        if disjoint and not 0 < len(set(constants)) + sum(sizes) <= SIZE_LIMIT:
+            continue
+
+        for gs in product(*(combinations(groups[i][0], size) for i, size in zip(indexes, sizes))):
+            morpheme_semes = list(set(chain(*gs, constants)))
+            if len(morpheme_semes) == 0 or len(morpheme_semes) > SIZE_LIMIT:
+                continue
+
+            yield PolyMorpheme(constant=morpheme_semes)
+
+
+def _unrank_combination(items, size, rank):
+    """The combination of index rank in the order of itertools.combinations(items, size)"""
+    res = []
+    start = 0
+    for k in range(size, 0, -1):
+        for e in range(start, len(items)):
+            # number of combinations starting with items[e]
+            n = comb(len(items) - e - 1, k - 1)
+            if rank < n:
+                res.append(items[e])
+                start = e + 1
+                break
+            rank -= n
+
+    return tuple(res)
+
+
+def PM_singular_sequence_at(constants, groups, i):
+    """
+    The singular sequence at the index i of compute_PM_singular_sequences, computed from the groups sizes without
+    enumerating the previous singular sequences.
+    """
+    if not _disjoint(constants, groups):
+        return compute_PM_singular_sequences(constants, groups)[i]
+
+    SIZE_LIMIT = MORPHEME_SERIE_SIZE_LIMIT_CONTENT
+    n_constants = len(set(constants))
+
+    for indexes, sizes in _iter_groups_sizes(groups):
+        if not 0 < n_constants + sum(sizes) <= SIZE_LIMIT:
+            continue
+
+        radix = [comb(len(groups[g][0]), size) for g, size in zip(indexes, sizes)]
+        block = 1
+        for r in radix:
+            block *= r
 
-    for gs in iter_groups_combinations():
-        morpheme_semes = list(set(chain(*gs, constants)))
-        if len(morpheme_semes) == 0 or len(morpheme_semes) > SIZE_LIMIT:
+        if i >= block:
+            i -= block
             continue
 
-        m = PolyMorpheme(constant=morpheme_semes)
-        traits[str(m)] = m
+        # mixed radix decomposition, the last group varies the fastest
+        gs = []
+        for g, size, r in reversed(list(zip(indexes, sizes, radix))):
+            i, rank = divmod(i, r)
+            gs.append(_unrank_combination(groups[g][0], size, rank))
 
-    return tuple(traits.values())
+        return PolyMorpheme(constant=list(set(chain(*gs, constants))))
+
+    raise IndexError("Singular sequence index out of range")
+
+
+def iter_PM_singular_sequences(constants, groups):
+    """
+    Lazy version of compute_PM_singular_sequences, the singular sequences are generated in the same order and are
+    never all held in memory.
+    """
+    if not groups:
+        return
+
+    if not _disjoint(constants, groups):
+        yield from compute_PM_singular_sequences(constants, groups)
+        return
+
+    yield from _iter_PM_singular_sequences(constants, groups)
+
+
+def count_PM_singular_sequences(constants, groups):
+    """
+    The number of singular sequences of a polymorpheme, computed from the groups sizes and multiplicities without
+    enumerating them.
+    """
+    if not groups:
+        return 1
+
+    if not _disjoint(constants, groups):
+        return len(compute_PM_singular_sequences(constants, groups))
+
+    SIZE_LIMIT = MORPHEME_SERIE_SIZE_LIMIT_CONTENT
+    n_constants = len(set(constants))
+
+    total = 0
+    for indexes, sizes in _iter_groups_sizes(groups):
+        if not 0 < n_constants + sum(sizes) <= SIZE_LIMIT:
+            continue
+
+        block = 1
+        for i, size in zip(indexes, sizes):
+            block *= comb(len(groups[i][0]), size)
+        total += block
+
+    return total
 
 
 
 class PolyMorpheme(USL):
+    __slots__ = ('constant', 'groups', '_cardinal')
+
     syntactic_level = 1
 
     def __init__(self, constant: List[Script]=(), groups=()):
@@ -160,15 +300,20 @@ class PolyMorpheme(USL):
 
         # self.groups_paradigms = [PolyMorpheme(groups=[g]) for g in groups]
 
-        self._str = ' '.join(chain(map(str, self.constant),
-                               ["m{}({})".format(mult, ' '.join(map(str, group))) for group, mult
-                                    in self.groups]))
-
         if not self.constant:
             self.constant = (NULL_SCRIPTS[0],)
 
         self.grammatical_class = max((s.grammatical_class for s in self.constant),
                                      default=AUXILIARY_CLASS)
+
+        self._cardinal = None
+
+    def _render(self):
+        # the null script of an empty constant is not written
+        return ' '.join(chain((str(m) for m in self.constant if not m.empty),
+                              ["m{}({})".format(mult, ' '.join(map(str, group))) for group, mult
+                               in self.groups]))
+
     @property
     def empty(self):
         return not self.groups and len(self.constant) == 1 and self.constant[0].empty
@@ -181,10 +326,13 @@ class PolyMorpheme(USL):
                (len(self.constant) == len(other.constant) and self.constant < other.constant) or \
                (self.constant == other.constant and self.groups < other.groups)
 
+    def _compute_order_key(self):
+        return len(self.constant), self.constant, self.groups
+
     def iter_structure(self):
         yield from self.morphemes
 
-    def iter_structure_path(self, flexion=False):
+    def _iter_structure_path(self, flexion=False):
         from ieml.usl.decoration.path import PolymorphemePath, GroupIndex, FlexionPath
 
         res_f = lambda u, grp_idx, multiplicity: (FlexionPath(morpheme=u) if flexion else
@@ -208,6 +356,31 @@ class PolyMorpheme(USL):
     def morphemes(self):
         return sorted(set(list(self.constant) + [m for g in self.groups for m in g[0]]))
 
+    @property
+    def cardinal(self):
+        if self._cardinal is None:
+            if self._singular_sequences is not None:
+                self._cardinal = len(self._singular_sequences)
+            else:
+                self._cardinal = count_PM_singular_sequences(self.constant, self.groups)
+
+        return self._cardinal
+
+    def _singular_sequence_at(self, i):
+        if self._singular_sequences is not None or not self.groups:
+            return self.singular_sequences[i]
+
+        return PM_singular_sequence_at(self.constant, self.groups, i)
+
+    def iter_singular_sequences(self):
+        """
+        Iterate over the singular sequences in the order of singular_sequences, without computing them all.
+        """
+        if self._singular_sequences is not None or not self.groups:
+            yield from self.singular_sequences
+        else:
+            yield from iter_PM_singular_sequences(self.constant, self.groups)
+
     def _compute_singular_sequences(self):
         res = compute_PM_singular_sequences(self.constant, self.groups)
         if res is None:
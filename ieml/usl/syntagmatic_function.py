@@ -1,13 +1,14 @@
 from collections import defaultdict
-from itertools import chain, product
+from itertools import chain
 from typing import List, Any, Dict, Type, Tuple, Union
 
+from ieml.commons import ProductSequence
 from ieml.dictionary.script import Script
 from ieml.usl import PolyMorpheme
 from ieml.usl.constants import SYNTAGMATIC_FUNCTION_SCRIPT, INDEPENDANT_QUALITY, DEPENDANT_QUALITY, ACTANTS_SCRIPTS, \
     ADDRESS_PROCESS_VALENCE_SCRIPTS, ADDRESS_SCRIPTS, ADDRESS_ACTANTS_MOTOR_SCRIPTS, INITIATOR_SCRIPT, \
     INTERACTANT_SCRIPT, RECIPIENT_SCRIPT, TIME_SCRIPT, LOCATION_SCRIPT, MANNER_SCRIPT, CAUSE_SCRIPT, INTENTION_SCRIPT, \
-    check_address_script, SYNTAGMATIC_FUNCTION_PROCESS_TYPE_SCRIPT, SYNTAGMATIC_FUNCTION_ACTANT_TYPE_SCRIPT, \
+    iter_address_script_errors, SYNTAGMATIC_FUNCTION_PROCESS_TYPE_SCRIPT, SYNTAGMATIC_FUNCTION_ACTANT_TYPE_SCRIPT, \
     SYNTAGMATIC_FUNCTION_QUALITY_TYPE_SCRIPT, ADDRESS_SCRIPTS_ORDER, class_from_address, \
     JUNCTION_INDEX, JUNCTION_SCRIPTS, ADDRESS_ROLE_IN_PROCESS
 
@@ -15,6 +16,8 @@ X = Any
 
 
 class SyntagmaticRole:
+    __slots__ = ('constant', '_str', 'key')
+
     def __init__(self, constant: List[Script]=()):
 
         self.constant = tuple(constant)
@@ -25,18 +28,18 @@ class SyntagmaticRole:
             raise ValueError("Invalid script in a syntagmatic role: " +\
                              ' '.join(map(str, filter(lambda e: e not in ADDRESS_SCRIPTS, constant))))
 
+        # the canonical key of the role, the order of its address scripts
+        self.key = tuple(ADDRESS_SCRIPTS_ORDER[s] for s in self.constant)
+
     def __str__(self):
         return self._str
 
     def __lt__(self, other):
-        return self.__class__ == other.__class__ and (
-                (all(s in ADDRESS_SCRIPTS for s in chain(self.constant, other.constant)) and \
-                 [ADDRESS_SCRIPTS_ORDER[s] for s in self.constant] < [ADDRESS_SCRIPTS_ORDER[s] for s in other.constant]) or \
-                (any(s not in ADDRESS_SCRIPTS for s in chain(self.constant, other.constant)) and (\
-                 len(self.constant) < len(other.constant) or self.constant < other.constant))
-        )
+        return self.__class__ == other.__class__ and self.key < other.key
 
     def __eq__(self, other):
+        if isinstance(other, SyntagmaticRole):
+            return self.key == other.key
         return str(self) == str(other)
 
     def __hash__(self):
@@ -52,17 +55,34 @@ class SyntagmaticRole:
 class SyntagmaticFunction:
     def __init__(self, actor: X, _actors: Dict[List[Script], 'SyntagmaticFunction']):
         self.actor = actor
-        self.actors = {SyntagmaticRole(constant=role): f for role, f in _actors.items()}
+        # the actors in the canonical order of their roles, equal syntagmatic functions list their actors (and the
+        # words their structure paths and singular sequences) in the same order
+        self.actors = {r: f for r, f in sorted(((SyntagmaticRole(constant=role), f) for role, f in _actors.items()),
+                                               key=lambda e: e[0].key)}
+
+        self._key = None
+        # (role, context) -> rendered string
+        self._renders = {}
+
+    @property
+    def key(self):
+        """
+        The canonical key of the syntagmatic function, the (role key, actor order key) pairs sorted by role. It is
+        used for the equality, the ordering and the hash.
+        """
+        if self._key is None:
+            self._key = tuple(sorted((role.key, () if sfun.actor is None else sfun.actor.order_key)
+                                     for role, sfun in self.actors.items()))
+        return self._key
 
     def __eq__(self, other):
-        s_actors = sorted([(p, a.actor) for p, a in self.actors.items()], key=lambda e: e[0])
-        o_actors = sorted([(p, a.actor) for p, a in other.actors.items()], key=lambda e: e[0])
-        return s_actors == o_actors
+        return isinstance(other, SyntagmaticFunction) and self.key == other.key
 
     def __lt__(self, other):
-        s_actors = sorted([(p, a.actor) for p, a in self.actors.items()], key=lambda e: e[0])
-        o_actors = sorted([(p, a.actor) for p, a in other.actors.items()], key=lambda e: e[0])
-        return s_actors < o_actors
+        return self.key < other.key
+
+    def __hash__(self):
+        return hash(self.key)
 
     # @property
     # def role(self):
@@ -83,6 +103,11 @@ class SyntagmaticFunction:
     def get(self, role: SyntagmaticRole, ignore_prefix=False, ignore_process_valence=False) -> X:
         # UNUSED ?
         # assert role.is_singular
+        return self.actors[self.actor_role(role, ignore_prefix=ignore_prefix,
+                                           ignore_process_valence=ignore_process_valence)].actor
+
+    def actor_role(self, role: SyntagmaticRole, ignore_prefix=False, ignore_process_valence=False) -> SyntagmaticRole:
+        """The key of self.actors that get looks up for the role"""
         if ignore_prefix and role.constant[0] not in ADDRESS_ROLE_IN_PROCESS:
             # in the case of a process syntagm, we do not ignore the prefix
             role = SyntagmaticRole(list(role.constant)[1:])
@@ -96,7 +121,7 @@ class SyntagmaticFunction:
 
             role = SyntagmaticRole([valence] + list(role.constant)[1:])
 
-        return self.actors[role].actor
+        return role
 
     def get_paradigm(self, role: SyntagmaticRole) -> List[X]:
         # UNUSED ?
@@ -136,6 +161,16 @@ class SyntagmaticFunction:
             return None
 
     def render_with_context(self, role: SyntagmaticRole=None, context=None):
+        try:
+            return self._renders[(role, context)]
+        except KeyError:
+            pass
+
+        res = self._render_with_context(role, context)
+        self._renders[(role, context)] = res
+        return res
+
+    def _render_with_context(self, role, context):
         prefix = tuple()
         if context is not None:
             prefix = self.get_context_role_prefix(context)
@@ -145,7 +180,7 @@ class SyntagmaticFunction:
                     ','
                 ))
 
-        main_roles_expansion = self.get_role_expansion(role, ignore_prefix=prefix)
+        main_roles_expansion = set(self.get_role_expansion(role, ignore_prefix=prefix))
 
         res = '['
 
@@ -154,7 +189,7 @@ class SyntagmaticFunction:
                 + ((str(prefix[0]) + ' ') if prefix else '')
                 + str(address) + ' '
                 + str(self.actors[address].actor)
-            for address in sorted(self.actors) if not isinstance(self.actors[address], JunctionSyntagmaticFunction)
+            for address in sorted(self.actors, key=lambda r: r.key) if not isinstance(self.actors[address], JunctionSyntagmaticFunction)
         ])
         return res + ']'
 
@@ -172,7 +207,8 @@ class SyntagmaticFunction:
 
         _ignore_prefix = lambda e : SyntagmaticRole(constant=e.constant[len(ignore_prefix):])
 
-        return sorted(SyntagmaticRole(r) for r in _expand_junction(_ignore_prefix(role).constant))
+        return sorted((SyntagmaticRole(r) for r in _expand_junction(_ignore_prefix(role).constant)),
+                      key=lambda r: r.key)
 
     def as_list(self, context_type) -> List[Tuple[List[Script], X]]:
         prefix = self.get_context_role_prefix(context_type)
@@ -190,6 +226,9 @@ class SyntagmaticFunction:
         if not l:
             raise ValueError("Empty syntagmatic function")
 
+        if not all(address for address, _ in l):
+            raise ValueError("Invalid syntagmatic function, a lexeme has no address")
+
         roles = [address[0] for address, _ in l]
         children_l = [(address[1:], x) for address, x in l]
 
@@ -216,30 +255,70 @@ class SyntagmaticFunction:
         raise ValueError("Invalid syntagmatic function, unknown function.")
 
     def check(self, X: Type, check_X, sfun_type):
+        def _iter_X_errors(x, sfun):
+            check_X(x, sfun=sfun)
+            return ()
+
+        for _, message in self.iter_errors(X, _iter_X_errors, sfun_type):
+            raise ValueError(message)
+
+    def iter_errors(self, X: Type, iter_X_errors, sfun_type):
+        """
+        Yield every violation of the syntagmatic function checks.
+
+        :param X: the expected type of the actors
+        :param iter_X_errors: a function (actor, sfun) -> iterator of (component, error message)
+        :param sfun_type: the type of the root syntagmatic function
+        :return: an iterator of (component, error message)
+        """
         if not isinstance(self, JunctionSyntagmaticFunction):
             if not isinstance(self.actor, X):
-                raise ValueError("The process of a SyntagmaticFunction is expected to be a {}, not a {}."
-                                 .format(X.__name__, self.actor.__class__.__name__))
-
-            check_X(self.actor, sfun=self)
+                yield str(self.actor), "The process of a SyntagmaticFunction is expected to be a {}, not a {}."\
+                    .format(X.__name__, self.actor.__class__.__name__)
+            else:
+                yield from iter_X_errors(self.actor, sfun=self)
 
         for address, x in self.actors.items():
             if not isinstance(address, SyntagmaticRole):
-                raise ValueError("An address in a SyntagmaticFunction is expected to be a polymorpheme, not a {}."
-                                 .format(address.__class__.__name__))
+                yield str(address), "An address in a SyntagmaticFunction is expected to be a polymorpheme, not a {}."\
+                    .format(address.__class__.__name__)
+                continue
 
-            check_address_script(address.constant, sfun_type=sfun_type)
+            yield from iter_address_script_errors(address.constant, sfun_type=sfun_type)
 
     def singular_sequences(self, context_type):
-        sfun_l = self.as_list(context_type)
+        return self.singular_sequences_product(context_type, build=lambda sfun: sfun)
 
-        res = []
-        roles, x_l = zip(*sfun_l)
-        for x_l_ss in product(*[x.singular_sequences for x in x_l]):
+    def singular_sequences_product(self, context_type, build, decompose=None):
+        """
+        The lazy product of the singular sequences of the actors of the syntagmatic function.
+
+        :param context_type: the syntagmatic function type context
+        :param build: a function SyntagmaticFunction -> element of the sequence
+        :param decompose: a function element -> SyntagmaticFunction
+        :return: a ieml.commons.ProductSequence
+        """
+        roles, x_l = zip(*self.as_list(context_type))
+
+        def _build(x_l_ss):
             ctx, sfun = self.from_list(list(zip(roles, x_l_ss)))
-            res.append(sfun)
+            return build(sfun)
 
-        return res
+        def _decompose(e):
+            sfun = e if decompose is None else decompose(e)
+            if not isinstance(sfun, SyntagmaticFunction):
+                return None
+
+            try:
+                actors = {tuple(r): x for r, x in sfun.as_list(context_type)}
+            except ValueError:
+                return None
+
+            if len(actors) != len(roles):
+                return None
+            return tuple(actors.get(tuple(r)) for r in roles)
+
+        return ProductSequence([x.singular_sequences for x in x_l], build=_build, decompose=_decompose)
 
 
 class JunctionSyntagmaticFunction(SyntagmaticFunction):
@@ -294,11 +373,11 @@ class JunctionSyntagmaticFunction(SyntagmaticFunction):
 
         return cls(junction_link=link, children=[context._from_list(g_v) for g_v in groups])
 
-    def check(self, X: Type, check_X, sfun_type):
-        super().check(X, check_X, sfun_type)
+    def iter_errors(self, X: Type, iter_X_errors, sfun_type):
+        yield from super().iter_errors(X, iter_X_errors, sfun_type)
 
         for c in self.children:
-            c.check(X, check_X, sfun_type)
+            yield from c.iter_errors(X, iter_X_errors, sfun_type)
 
 
 class IndependantQualitySyntagmaticFunction(SyntagmaticFunction):
@@ -387,22 +466,22 @@ class DependantQualitySyntagmaticFunction(SyntagmaticFunction):
 
         return cls(actor=actor, dependant=dependant, independant=independant)
 
-    def check(self, X, check_X, sfun_type):
-        super().check(X, check_X, sfun_type)
+    def iter_errors(self, X, iter_X_errors, sfun_type):
+        yield from super().iter_errors(X, iter_X_errors, sfun_type)
 
         if self.independant is not None:
             if not isinstance(self.independant, (IndependantQualitySyntagmaticFunction, JunctionSyntagmaticFunction)):
-                raise ValueError("A quality is expected to be a IndependantQualitySyntagmaticFunction or a JunctionSyntagmaticFunction, not a {}."
-                             .format(self.independant.__class__.__name__))
-
-            self.independant.check(X, check_X, sfun_type)
+                yield str(self.independant), "A quality is expected to be a IndependantQualitySyntagmaticFunction or a JunctionSyntagmaticFunction, not a {}."\
+                    .format(self.independant.__class__.__name__)
+            else:
+                yield from self.independant.iter_errors(X, iter_X_errors, sfun_type)
 
         if self.dependant is not None:
             if not isinstance(self.dependant, (DependantQualitySyntagmaticFunction, JunctionSyntagmaticFunction)):
-                raise ValueError("An actant is expected to be a DependantQualitySyntagmaticFunction or a JunctionSyntagmaticFunction, not a {}."
-                                 .format(self.dependant.__class__.__name__))
-
-            self.dependant.check(X, check_X, sfun_type)
+                yield str(self.dependant), "An actant is expected to be a DependantQualitySyntagmaticFunction or a JunctionSyntagmaticFunction, not a {}."\
+                    .format(self.dependant.__class__.__name__)
+            else:
+                yield from self.dependant.iter_errors(X, iter_X_errors, sfun_type)
 
 
 class ProcessSyntagmaticFunction(SyntagmaticFunction):
@@ -466,8 +545,8 @@ class ProcessSyntagmaticFunction(SyntagmaticFunction):
 
         return ProcessSyntagmaticFunction(actor=actor, actants=actants, valence=valence)
 
-    def check(self, X: Type, check_X, sfun_type):
-        super().check(X, check_X, sfun_type)
+    def iter_errors(self, X: Type, iter_X_errors, sfun_type):
+        yield from super().iter_errors(X, iter_X_errors, sfun_type)
 
         for actant, role in [(self.initiator, INITIATOR_SCRIPT),
                        (self.interactant, INTERACTANT_SCRIPT),
@@ -480,7 +559,7 @@ class ProcessSyntagmaticFunction(SyntagmaticFunction):
 
             if actant is not None:
                 if not isinstance(actant, (DependantQualitySyntagmaticFunction, JunctionSyntagmaticFunction)):
-                    raise ValueError("An actant of a word is expected to be a ActantSyntagmaticFunction or a JunctionSyntagmaticFunction, not a {}."
-                                     .format(actant.__class__.__name__))
-
-                actant.check(X, check_X, sfun_type)
+                    yield str(role), "An actant of a word is expected to be a ActantSyntagmaticFunction or a JunctionSyntagmaticFunction, not a {}."\
+                        .format(actant.__class__.__name__)
+                else:
+                    yield from actant.iter_errors(X, iter_X_errors, sfun_type)
@@ -4,12 +4,38 @@ from typing import List
 
 import tqdm
 
-from ieml.commons import cached_property
+from ieml.commons import cached_property, ProductSequence
 from ieml.dictionary.script import Script
 from ieml.usl import USL, PolyMorpheme
-from ieml.usl.decoration.path import UslPath, PolymorphemePath, FlexionPath, LexemePath, LexemeIndex
+from ieml.usl.decoration.path import UslPath, PolymorphemePath, FlexionPath, LexemePath, LexemeIndex, RolePath, \
+    PathValuesBuilder
 from ieml.usl.usl import usl
 
+# number of rows of cells materialized at once by UslTable2D.iter_pages
+TABLE_PAGE_SIZE = 64
+
+
+def _order_position(u: USL, path: UslPath) -> tuple:
+    """
+    The position of the node at the path in the order key of u (see USL.order_key): the USLs that differ only by
+    their nodes at some paths are ordered by their node at the lowest position.
+
+    :param u: a polymorpheme, a lexeme or a word
+    :param path: the path of a node in u
+    :return: the position, a tuple of role keys and lexeme indexes
+    """
+    res = []
+    while path is not None:
+        if isinstance(path, RolePath):
+            # the actors are compared in the order of their roles
+            res.append(u.syntagmatic_fun.actor_role(path.role, ignore_prefix=True, ignore_process_valence=True).key)
+        elif isinstance(path, LexemePath):
+            # the flexion is compared before the content
+            res.append(0 if path.index == LexemeIndex.FLEXION else 1)
+        path = path.child
+
+    return tuple(res)
+
 
 class UslTable2D:
     def __init__(self, usl: USL, columns: UslPath, rows: UslPath=None):
@@ -26,43 +52,47 @@ class UslTable2D:
         The paradigms are ordered as they will appear in the column tables
         """
 
-        res = []
-        row_variations = [(path, ss) for l in self.row_paths_variation for path, ss in l]
-
-        for column_path_values_list in self.column_paths_constant:
-            res.append(usl(self.constant_paths + column_path_values_list + row_variations))
-
-        return res
+        return [self.column(j) for j in range(self.shape[1])]
 
     @cached_property
     def rows(self) -> List[USL]:
-        res = []
-        column_variations = [(path, ss) for l in self.column_paths_variation for path, ss in l]
+        return [self.row(i) for i in range(self.shape[0])]
 
-        for row_path_values_list in self.row_paths_constant:
-            res.append(usl(self.constant_paths + row_path_values_list + column_variations))
+    @cached_property
+    def column_variations(self):
+        """The (path, ss) of all the variations of the columns, shared by the rows headers"""
+        return [(path, ss) for l in self.column_paths_variation for path, ss in l]
 
-        return res
+    @cached_property
+    def row_variations(self):
+        """The (path, ss) of all the variations of the rows, shared by the columns headers"""
+        return [(path, ss) for l in self.row_paths_variation for path, ss in l]
 
     @cached_property
     def column_paths_variation(self):
         """Return a list of the variation that correspond to the dimension of variations of each column"""
-        res = []
-        u = self._columns.deference(self.usl)
+        return ProductSequence([self._column_factor], build=lambda c: self._column_paths(c[0]))
 
-        ss_to_groups_path = {ss_v: p.without_morpheme() for p, ss_v in u.iter_structure_path_by_script_ss()}
+    @cached_property
+    def _column_factor(self):
+        """The singular sequences of the columns node, in the order of their sort keys"""
+        return sorted(self._columns.deference(self.usl).singular_sequences, key=lambda ss: ss.sort_key)
 
-        for ss in self._columns.deference(self.usl).singular_sequences:
-            res.append([(self._columns.concat(ss_to_groups_path[morph], force=False), morph)
-                            for path, morph in ss.iter_structure_path_by_script_ss()])
+    @cached_property
+    def _column_groups_path(self):
+        """morpheme -> path of its group in the columns node"""
+        return {ss_v: p.without_morpheme()
+                for p, ss_v in self._columns.deference(self.usl).iter_structure_path_by_script_ss()}
 
-        # return sorted(res, key=lambda l: usl(l + self.constant_paths))
-        return sorted(res, key=lambda l: usl([(path.as_constant(vv), vv) for path, vv in l] + self.constant_paths))
+    def _column_paths(self, ss):
+        return [(self._columns.concat(self._column_groups_path[morph], force=False), morph)
+                for path, morph in ss.iter_structure_path_by_script_ss()]
 
     @cached_property
     def column_paths_constant(self):
         """Return a list of List[(path, ss)], that correspond to the variable path and constant ss of self.columns"""
-        return [[(p.as_constant(ss), ss) for p, ss in l] for l in self.column_paths_variation]
+        return ProductSequence([self._column_factor],
+                               build=lambda c: [(p.as_constant(ss), ss) for p, ss in self._column_paths(c[0])])
 
     @cached_property
     def row_paths_constant(self):
@@ -70,15 +100,27 @@ class UslTable2D:
         dim of variation that are not used by self.columns.
         The path returned as returned as constant."""
 
-        return [[(path.as_constant(morph), morph) for path, morph in l]
-                 for l in self.row_paths_variation]
+        return ProductSequence(self._row_factors,
+                               build=lambda c: [(path.as_constant(morph), morph) for path, morph in self._row_paths(c)])
 
     @cached_property
     def row_paths_variation(self):
         """Return a list of List[(path, ss)], that correspond to the path and constant ss of self.rows or all the
         dim of variation that are not used by self.columns.
-        The path returned as returned as constant."""
+        The path returned as returned as constant.
+
+        The rows are the product of the singular sequences of the nodes of _row_variations_by_pm, each sorted by
+        sort key: as the nodes are in the order of their comparison, the product is in the order of the rows USLs."""
+        return ProductSequence(self._row_factors, build=self._row_paths)
 
+    def _row_paths(self, components):
+        return [(path.concat(p2).as_constant(ss), ss)
+                for path, vv in chain(self._row_constants, *components)
+                for p2, ss in vv.iter_structure_path_by_script_ss()]
+
+    @cached_property
+    def _row_dimensions(self):
+        """The paths of the dimensions of variation and of the constant dimensions of the rows"""
         constant_dim = set()
         variations_dim = set()
         if self._rows is not None:
@@ -98,67 +140,44 @@ class UslTable2D:
                     if path.deference(self.usl).cardinal != 1:
                         variations_dim.add(path.without_morpheme())
 
-        variations = []
-
-        for path_dim in variations_dim:
-            bin = []
-            for ss in path_dim.deference(self.usl).singular_sequences:
-                bin.append([(path_dim.without_morpheme(), morph)
-                            for _, morph in ss.iter_structure_path_by_script_ss()])
-
-            variations.append(bin)
+        return variations_dim, constant_dim
 
+    @cached_property
+    def _row_constants(self):
         constants = []
-        for path_dim in constant_dim:
+        for path_dim in self._row_dimensions[1]:
             for ss in path_dim.deference(self.usl).singular_sequences:
                 constants.append((path_dim, ss))
 
+        return constants
 
-        # group variation by pm for correct ss iteration
+    @cached_property
+    def _row_variations_by_pm(self):
+        """
+        The dimensions of variation of the rows grouped by polymorpheme (or by lexeme for a flexion), for a correct
+        singular sequences iteration: a list of (path of the polymorpheme, USL of its variations, morpheme -> path
+        of its group), in the order the polymorphemes are compared in the rows USLs.
+        """
         pm_bin = defaultdict(list)
-        for path_dim in variations_dim:
+        for path_dim in self._row_dimensions[0]:
 
             path_head, path_tail = path_dim.split_tail()
             if isinstance(path_tail, (PolymorphemePath)) or \
                 (isinstance(path_tail, LexemePath) and path_tail.index == LexemeIndex.FLEXION):
                 pm_bin[path_head].extend([(path_tail, ss) for p, ss in path_dim.deference(self.usl).iter_structure_path_by_script_ss()])
-        # ss -> group
-
-        # ss_to_group_path = {k: v for k, v in path_bin}
-
-
-        variations_by_pm = []
-        for path_bin, v in pm_bin.items():
-            pm_struct = []
-            ss_to_groups_path = {ss_v: path_tail for path_tail, ss_v in v}
-            for pm_ss in usl(v).singular_sequences:
-                group_ss = []
-                for _, ss in pm_ss.iter_structure_path_by_script_ss():
-                    path = path_bin.concat(ss_to_groups_path[ss])
 
-                    group_ss.append((path, ss))
-
-                pm_struct.append(group_ss)
-            variations_by_pm.append(pm_struct)
-
-        # path -> pm
-        # variations_by_pm = [[[(path.concat(p_ss), ss) for p_ss, ss in pm_ss.iter_structure_path_by_script_ss()]
-        #                         for pm_ss in usl(v).singular_sequences]
-        #                         for path, v in pm_bin.items()]
+        return [(path_bin, usl(v), {ss_v: path_tail for path_tail, ss_v in v})
+                for path_bin, v in sorted(pm_bin.items(), key=lambda e: _order_position(self.usl, e[0]))]
 
+    @cached_property
+    def _row_factors(self):
+        """For each polymorpheme of _row_variations_by_pm, the paths of its singular sequences sorted by sort key"""
         res = []
-        for vars in product(*variations_by_pm):
-            # for vars in product(*sorted(variations, reverse=True,
-            #                             key=lambda bin: min(ss for v in bin for _, ss in v if not ss.empty))):
-            res.append(sum(vars, constants))
+        for path_bin, u, ss_to_groups_path in self._row_variations_by_pm:
+            res.append([[(path_bin.concat(ss_to_groups_path[ss]), ss) for _, ss in pm_ss.iter_structure_path_by_script_ss()]
+                        for pm_ss in sorted(u.singular_sequences, key=lambda pm_ss: pm_ss.sort_key)])
 
-        res2 = []
-        for l in res:
-            res2.append([(path.concat(p2).as_constant(ss), ss)
-                         for path, vv in l
-                         for p2, ss in vv.iter_structure_path_by_script_ss()])
-
-        return sorted(res2, key=lambda l: usl([(path.as_constant(), vv) for path, vv in l] + self.constant_paths))
+        return res
 
     @cached_property
     def constant_paths(self):
@@ -175,20 +194,213 @@ class UslTable2D:
 
         return res
 
+    @cached_property
+    def shape(self):
+        """The number of rows and of columns of the table, computed from the cardinals of the nodes of variation"""
+        n_rows = 1
+        for _, u, _ in self._row_variations_by_pm:
+            n_rows *= u.cardinal
+
+        return n_rows, self._columns.deference(self.usl).cardinal
+
+    @cached_property
+    def cell_sequence(self) -> ProductSequence:
+        """
+        The lazy sequence of the cells, row by row. The coordinates of the cell k are divmod(k, number of columns),
+        a cell is built from the constant paths and the paths of its row and column only when accessed.
+        """
+        return ProductSequence([self.row_paths_constant, self.column_paths_constant],
+                               build=lambda c: self.builder.build(c[1] + c[0]))
+
+    @cached_property
+    def builder(self) -> PathValuesBuilder:
+        """The builder of the USLs of the table, that share the constant paths"""
+        return PathValuesBuilder(self.constant_paths)
+
+    def cell(self, row: int, column: int) -> USL:
+        return self.cell_sequence[row * self.shape[1] + column]
+
+    def row(self, i: int) -> USL:
+        """The paradigm of the cells of the row i, as in self.rows"""
+        return self.builder.build(self.row_paths_constant[i] + self.column_variations)
+
+    def column(self, j: int) -> USL:
+        """The paradigm of the cells of the column j, as in self.columns"""
+        return self.builder.build(self.column_paths_constant[j] + self.row_variations)
+
+    def page(self, row_start: int=0, row_stop: int=None, column_start: int=0, column_stop: int=None) -> List[List[USL]]:
+        """
+        The cells of a rectangle of the table, the other cells are not built.
+
+        :return: the list of the rows of cells of [row_start, row_stop) x [column_start, column_stop)
+        """
+        n_rows, n_columns = self.shape
+        row_start, row_stop, _ = slice(row_start, row_stop).indices(n_rows)
+        column_start, column_stop, _ = slice(column_start, column_stop).indices(n_columns)
+
+        return [self.cell_sequence[i * n_columns + column_start: i * n_columns + column_stop]
+                for i in range(row_start, row_stop)]
+
+    def iter_pages(self, page_size: int=TABLE_PAGE_SIZE):
+        """Yield the rows of cells of the table by pages of page_size rows"""
+        for start in range(0, self.shape[0], page_size):
+            yield self.page(start, start + page_size)
+
     @cached_property
     def cells(self):
-        cells = []
-        for row_path_values_list in tqdm.tqdm(self.row_paths_constant):
-            cells_row = []
+        n_columns = self.shape[1]
+        return [self.cell_sequence[i * n_columns: (i + 1) * n_columns] for i in tqdm.tqdm(range(self.shape[0]))]
+
+
+class UslTableND:
+    """
+    A table of the singular sequences of an USL paradigm along any number of dimensions. A dimension is a path of
+    the USL, its coordinates are the singular sequences of the node at this path. The first dimension is the rows,
+    the second the columns and the others the tabs. The cells are built only when accessed and are streamed one tab
+    or one page at a time, the whole hypercube is never in memory.
+    """
+    def __init__(self, usl: USL, dimensions: List[UslPath]=None):
+        """
+        :param usl: the paradigm
+        :param dimensions: the paths of the dimensions (rows, columns, tabs...), if None they are chosen with
+        UslTableND.choose_dimensions
+        """
+        self.usl = usl
+        self.dimensions = list(self.choose_dimensions(usl) if dimensions is None else dimensions)
+
+        for d in self.dimensions:
+            if any(o is not d and d.has_prefix(o) for o in self.dimensions):
+                raise ValueError("The dimension {} is inside another dimension".format(str(d)))
+
+    @staticmethod
+    def choose_dimensions(usl: USL) -> List[UslPath]:
+        """
+        The deepest paths of the USL that vary. The groups of a polymorpheme are separate dimensions only if the
+        singular sequences of the polymorpheme are their product, otherwise the polymorpheme is one dimension.
 
-            for column_path_values_list in self.column_paths_constant:
-                cells_row.append(usl(self.constant_paths +
-                                     column_path_values_list +
-                                     row_path_values_list))
+        :return: the paths, by decreasing cardinal
+        """
+        varying = set()
+        for path, _ in usl.iter_structure_path_by_script_ss():
+            path = path.without_morpheme()
+            if path not in varying and path.deference(usl).cardinal != 1:
+                varying.add(path)
+
+        leaves = [p for p in varying if not any(o != p and o.has_prefix(p) for o in varying)]
+
+        pm_bin = defaultdict(list)
+        res = []
+        for path in leaves:
+            path_head, path_tail = path.split_tail()
+            if isinstance(path_tail, PolymorphemePath):
+                pm_bin[path_head].append(path)
+            else:
+                res.append(path)
+
+        for path_head, paths in pm_bin.items():
+            cardinal = 1
+            for path in paths:
+                cardinal *= path.deference(usl).cardinal
 
-            cells.append(cells_row)
+            if len(paths) > 1 and cardinal != path_head.deference(usl).cardinal:
+                res.append(path_head)
+            else:
+                res.extend(paths)
+
+        return sorted(res, key=lambda p: (-p.deference(usl).cardinal, str(p)))
+
+    @cached_property
+    def coordinates(self) -> List[List[list]]:
+        """For each dimension, the (constant path, ss) of each of its singular sequences, in their order"""
+        res = []
+        for dim in self.dimensions:
+            u = dim.deference(self.usl)
+            ss_to_groups_path = {ss_v: p.without_morpheme() for p, ss_v in u.iter_structure_path_by_script_ss()}
+
+            res.append([[(dim.concat(ss_to_groups_path[morph], force=False).as_constant(morph), morph)
+                         for _, morph in ss.iter_structure_path_by_script_ss()]
+                        for ss in u.singular_sequences])
+        return res
+
+    @cached_property
+    def constant_paths(self):
+        """The (path, ss) of the USL outside of the dimensions, shared by all the cells"""
+        return [(path, ss) for path, ss in self.usl.iter_structure_path_by_script_ss()
+                if not any(path.has_prefix(dim) for dim in self.dimensions)]
+
+    @cached_property
+    def shape(self):
+        return tuple(len(c) for c in self.coordinates)
+
+    @cached_property
+    def tabs_shape(self):
+        """The shape of the tabs, () if the table has less than 3 dimensions"""
+        return self.shape[2:]
+
+    @cached_property
+    def cell_sequence(self) -> ProductSequence:
+        """
+        The lazy sequence of the cells, tab by tab then row by row. The tab dimensions vary the slowest and the
+        columns the fastest.
+        """
+        # the missing rows or columns are a single empty coordinate
+        coordinates = self.coordinates + [[[]]] * (2 - len(self.coordinates))
+        builder = PathValuesBuilder(self.constant_paths)
+        return ProductSequence(coordinates[2:] + coordinates[:2],
+                               build=lambda c: builder.build(list(chain.from_iterable(c))))
+
+    def _flat_index(self, index):
+        if len(index) != len(self.shape):
+            raise ValueError("Expected {} coordinates, got {}".format(len(self.shape), len(index)))
+
+        shape = self.shape + (1,) * (2 - len(self.shape))
+        index = tuple(index) + (0,) * (2 - len(index))
+
+        res = 0
+        for i, n in zip(index[2:] + index[:2], shape[2:] + shape[:2]):
+            if not 0 <= i < n:
+                raise IndexError("Table index out of range")
+            res = res * n + i
+        return res
+
+    def cell(self, *index) -> USL:
+        """The cell at the coordinates index, one by dimension"""
+        return self.cell_sequence[self._flat_index(index)]
+
+    def header(self, dimension: int, i: int) -> USL:
+        """The singular sequence of the dimension at the coordinate i"""
+        return self.dimensions[dimension].deference(self.usl).singular_sequences[i]
+
+    def tab(self, *tab_index, row_start: int=0, row_stop: int=None) -> List[List[USL]]:
+        """
+        The cells of a tab, the other tabs are not built.
+
+        :param tab_index: the coordinates of the tab on the dimensions after the columns
+        :param row_start: the first row of the page of the tab
+        :param row_stop: the end of the page of the tab, if None the last row
+        :return: the list of the rows of cells of the tab
+        """
+        shape = self.shape + (1,) * (2 - len(self.shape))
+        n_rows, n_columns = shape[:2]
+        row_start, row_stop, _ = slice(row_start, row_stop).indices(n_rows)
+
+        start = self._flat_index((0, 0) + tuple(tab_index)) if len(self.shape) > 2 else 0
+        return [self.cell_sequence[start + i * n_columns: start + (i + 1) * n_columns]
+                for i in range(row_start, row_stop)]
+
+    def iter_tabs(self, page_size: int=None):
+        """
+        Yield the cells of the table, one tab or one page of a tab at a time.
+
+        :param page_size: the number of rows by page, if None the whole tab
+        :return: an iterator of (tab index, first row, rows of cells)
+        """
+        n_rows = self.shape[0] if self.shape else 1
+        page_size = page_size or n_rows
 
-        return cells
+        for tab_index in product(*(range(n) for n in self.tabs_shape)):
+            for row_start in range(0, n_rows, page_size):
+                yield tab_index, row_start, self.tab(*tab_index, row_start=row_start, row_stop=row_start + page_size)
 
 
 def enumerate_partitions(usl: USL):
@@ -1,21 +1,139 @@
+import random
+import threading
+from itertools import chain
 from typing import Iterable, Tuple, Union, List, Set
+from weakref import WeakValueDictionary
 
 from ieml.commons import DecoratedComponent
-from ieml.dictionary.script import Script
+from ieml.dictionary.script import Script, NullScript
 # from ieml.usl.decoration.path import UslPath
 
 
-class USL(DecoratedComponent):
+# markers of the binary sort keys, the end of a tuple is lower than any element
+_SORT_KEY_END = b'\x00'
+_SORT_KEY_INT = b'\x01'
+_SORT_KEY_SCRIPT = b'\x02'
+_SORT_KEY_TUPLE = b'\x03'
+
+# width in bytes of the integers of the binary sort keys
+SORT_KEY_INT_SIZE = 4
+
+
+def _sort_key_int(i: int) -> bytes:
+    """The SORT_KEY_INT_SIZE bytes of an integer of a sort key, a ValueError if it does not fit in them"""
+    if not 0 <= i < 1 << (8 * SORT_KEY_INT_SIZE):
+        raise ValueError("The integer {} is out of the range of the sort keys, [0, 2**{})"
+                         .format(i, 8 * SORT_KEY_INT_SIZE))
+
+    return i.to_bytes(SORT_KEY_INT_SIZE, 'big')
+
+
+def script_sort_key(s: Script) -> bytes:
+    """
+    The binary key of the order of the scripts: the layer, the null script first, the cardinal then the canonical
+    form. The key of a singular script has a fixed width for its layer. It is consistent with Script.__lt__ for the
+    singular scripts, the only morphemes of a valid USL.
+
+    :param s: a script
+    :return: the binary key of the script
+    """
+    return bytes([s.layer, 0 if isinstance(s, NullScript) else 1]) + \
+           _sort_key_int(s.cardinal) + s.canonical + _SORT_KEY_END
+
+
+def encode_sort_key(key: tuple) -> bytes:
+    """
+    Encode an order key (nested tuples of integers and scripts) into bytes, the lexicographic order of the encoded
+    keys is the order of the tuples. Each integer is written on SORT_KEY_INT_SIZE bytes and each tuple is terminated
+    by a marker lower than any element, so a tuple is lower than the tuples it prefixes.
+
+    The keys have a variable length but a key is never the prefix of another one: each tuple and each script ends with
+    its end marker, so two different keys differ at the latest at the last marker of the shortest one.
+
+    :param key: an order key, see USL.order_key
+    :return: the binary key
+    :raises ValueError: if an integer of the key is negative or does not fit in SORT_KEY_INT_SIZE bytes
+    """
+    res = bytearray()
+    stack = [iter((key,))]
+    while stack:
+        try:
+            e = next(stack[-1])
+        except StopIteration:
+            stack.pop()
+            if stack:
+                res += _SORT_KEY_END
+            continue
+
+        if isinstance(e, tuple):
+            res += _SORT_KEY_TUPLE
+            stack.append(iter(e))
+        elif isinstance(e, Script):
+            res += _SORT_KEY_SCRIPT + script_sort_key(e)
+        elif isinstance(e, int):
+            res += _SORT_KEY_INT + _sort_key_int(e)
+        else:
+            raise ValueError("Invalid element in an order key: {}".format(e.__class__.__name__))
+
+    return bytes(res)
+
+
+# structural key of the canonical form (see USL.key) -> shared USL node
+_canonical_nodes = WeakValueDictionary()
+_canonical_nodes_lock = threading.Lock()
+
+
+def canonical(u: 'USL') -> 'USL':
+    """
+    Return the shared node of the canonical form of u, u itself if it is the first node of this form.
+
+    :param u: an USL
+    :return: the shared USL equal to u
+    """
+    if not u.__class__.canonical_nodes:
+        return u
+
+    key = u.key
+    with _canonical_nodes_lock:
+        return _canonical_nodes.setdefault(key, u)
+
+
+class CanonicalUSLMeta(type):
+    """Metaclass of the USLs, the constructors return the shared node of each canonical form."""
+    def __call__(cls, *args, **kwargs):
+        return canonical(super().__call__(*args, **kwargs))
+
+
+class USL(DecoratedComponent, metaclass=CanonicalUSLMeta):
+    __slots__ = ('_singular_sequences', '_singular_sequences_set', '_str', '_key', '_order_key',
+                 '_sort_key', '_structure_paths', '_structure_index', 'grammatical_class', '__weakref__')
+
     syntactic_level = 0
-    
+
+    # if the nodes of this class are shared between the equal USLs
+    canonical_nodes = True
+
+    # the caches that can reference the USL itself, they are not pickled
+    _unpickled_caches = ('_singular_sequences', '_singular_sequences_set', '_structure_paths', '_structure_index')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._singular_sequences = None
         self._singular_sequences_set = None
         self._str = None
+        self._key = None
+        self._order_key = None
+        self._sort_key = None
+        self._structure_paths = None
+        self._structure_index = None
 
         self.grammatical_class = None
 
+    def __getstate__(self):
+        slots = chain.from_iterable(getattr(c, '__slots__', ()) for c in self.__class__.__mro__)
+        return None, {k: None if k in self._unpickled_caches else getattr(self, k)
+                      for k in slots if k != '__weakref__' and hasattr(self, k)}
+
     def __bool__(self):
         return not self.empty
 
@@ -27,7 +145,28 @@ class USL(DecoratedComponent):
         raise NotImplementedError()
 
     def __str__(self):
+        """The IEML string of the USL, rendered on the first call"""
+        if self._str is None:
+            self._str = self._render()
+
         return self._str
+
+    def _render(self) -> str:
+        raise NotImplementedError()
+
+    @property
+    def key(self) -> tuple:
+        """
+        The structural key of the USL: two USLs of canonical classes are equal if and only if their keys are equal.
+        Computed once, without rendering the USL.
+        """
+        if self._key is None:
+            self._key = (self.__class__, self._compute_key())
+
+        return self._key
+
+    def _compute_key(self) -> tuple:
+        return self.order_key
     
     def __lt__(self, other):
         if isinstance(other, Script):
@@ -37,31 +176,91 @@ class USL(DecoratedComponent):
         if isinstance(other, InstancedUSL):
             other = other.usl
 
-        return self.syntactic_level < other.syntactic_level or \
-               (self.syntactic_level == other.syntactic_level and self.do_lt(other))
+        return self.order_key < other.order_key
 
     def do_lt(self, other):
         raise NotImplementedError()
 
+    @property
+    def order_key(self) -> tuple:
+        """
+        The key of the USL order : u0 < u1 if and only if u0.order_key < u1.order_key. Computed once.
+        """
+        if self._order_key is None:
+            self._order_key = (self.syntactic_level, self._compute_order_key())
+
+        return self._order_key
+
+    def _compute_order_key(self) -> tuple:
+        raise NotImplementedError()
+
+    @property
+    def sort_key(self) -> bytes:
+        """
+        The binary encoding of the order key : u0 < u1 if and only if u0.sort_key < u1.sort_key. Computed once.
+        """
+        if self._sort_key is None:
+            self._sort_key = encode_sort_key(self.order_key)
+
+        return self._sort_key
+
     def __eq__(self, other):
+        if self is other:
+            return True
+
+        if isinstance(other, USL) and self.canonical_nodes and other.canonical_nodes:
+            return self.key == other.key
+
         return str(self) == str(other)
 
     def __hash__(self):
         """Since the IEML string for a script is its definition, it can be used as a hash"""
-        return self._str.__hash__()
+        return str(self).__hash__()
 
     def __len__(self):
         return self.cardinal
 
     def __contains__(self, item):
+        from ieml.commons import ProductSequence
+        if isinstance(self.singular_sequences, ProductSequence):
+            # structural membership of each singular sequence, component by component
+            return all(ss in self.singular_sequences for ss in item.singular_sequences)
+
         return item.singular_sequences_set.issubset(self.singular_sequences_set)
 
     def iter_structure(self):
         raise NotImplementedError()
 
     def iter_structure_path(self, flexion=False) -> Iterable[Tuple['UslPath', 'USL']]:
+        return iter(self.structure_paths(flexion=flexion))
+
+    def structure_paths(self, flexion=False) -> Tuple[Tuple['UslPath', 'USL'], ...]:
+        """
+        The (path, node) of the structure of the USL, in the order of iter_structure_path. Computed once by flexion
+        mode, the paths and the nodes are shared by all the callers.
+        """
+        if self._structure_paths is None:
+            self._structure_paths = {}
+
+        flexion = bool(flexion)
+        if flexion not in self._structure_paths:
+            self._structure_paths[flexion] = tuple(self._iter_structure_path(flexion=flexion))
+
+        return self._structure_paths[flexion]
+
+    def _iter_structure_path(self, flexion=False) -> Iterable[Tuple['UslPath', 'USL']]:
         raise NotImplementedError()
 
+    @property
+    def structure_index(self) -> 'StructureIndex':
+        """
+        The index of the nodes of the USL by path and of the paths by node. Computed once.
+        """
+        if self._structure_index is None:
+            self._structure_index = StructureIndex(self)
+
+        return self._structure_index
+
     def iter_structure_path_by_type(self, _type=Script, flexion=False,):
         for path, item in self.iter_structure_path(flexion=flexion):
             if isinstance(item, _type):
@@ -100,16 +299,56 @@ class USL(DecoratedComponent):
     def is_singular(self) -> bool:
         return self.cardinal == 1
 
+    def sample(self, k: int, seed=None) -> List['USL']:
+        """
+        Draw k distinct singular sequences uniformly, without computing all the singular sequences.
+
+        :param k: the number of singular sequences to draw
+        :param seed: the seed of the random generator, the sample is reproducible for a given seed
+        :return: a list of k singular sequences
+        """
+        return [self._singular_sequence_at(i) for i in random.Random(seed).sample(range(self.cardinal), k)]
+
+    def _singular_sequence_at(self, i: int) -> 'USL':
+        """The singular sequence at the index i of singular_sequences"""
+        return self.singular_sequences[i]
+
     @property
     def morphemes(self) -> Set[Script]:
         raise NotImplementedError()
 
 
+class StructureIndex:
+    """
+    The nodes of an USL by path and the paths of each node, built from one traversal of USL.iter_structure_path. When
+    a path is yielded more than once, the first node is kept, the one UslPath.deference returns.
+    """
+    __slots__ = ('nodes', 'paths')
+
+    def __init__(self, u: USL):
+        # path -> node
+        self.nodes = {}
+        # node -> list of paths, in the order of iter_structure_path
+        self.paths = {}
+
+        for path, node in u.iter_structure_path():
+            self.nodes.setdefault(path, node)
+            self.paths.setdefault(node, []).append(path)
+
+    def node(self, path: 'UslPath'):
+        """The node at the path, None if the path is not in the structure"""
+        return self.nodes.get(path)
+
+    def paths_of(self, node) -> List['UslPath']:
+        """The paths of the node in the structure"""
+        return self.paths.get(node, [])
+
+
 def usl(arg: Union[str, Script, USL, Iterable[Tuple['UslPath', Union[USL, Script]]]]) -> USL:
     """
 
     Cast argument to an USL type, depending on the argument type.
-     - If argument is a string, it is parsed by ieml.usl.parser.IEMLParser.parse
+     - If argument is a string, it is parsed by ieml.usl.parser.SinglePassParser.parse
      - if argument is a ieml.dictionary.Script, the returned object is a
        ieml.usl.polymorpheme.PolyMorpheme with the argument as the constant.
      - if argument is an ieml.usl.usl.USL, the argument is returned
@@ -120,8 +359,8 @@ def usl(arg: Union[str, Script, USL, Iterable[Tuple['UslPath', Union[USL, Script
     :return: an ieml.usl.usl.USL
     """
     if isinstance(arg, str):
-        from ieml.usl.parser import IEMLParser
-        return IEMLParser().parse(arg)
+        from ieml.usl.parser import SinglePassParser
+        return SinglePassParser().parse(arg)
 
     if isinstance(arg, Script):
         from ieml.usl import PolyMorpheme
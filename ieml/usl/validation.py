@@ -0,0 +1,122 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Union
+
+from ieml.dictionary.script import Script
+from ieml.exceptions import CannotParse
+from ieml.usl import USL, PolyMorpheme, Lexeme, Word
+from ieml.usl.lexeme import iter_lexeme_errors
+from ieml.usl.polymorpheme import iter_polymorpheme_errors
+from ieml.usl.word import iter_word_errors
+
+# number of USLs sent at once to a worker process
+VALIDATION_CHUNK_SIZE = 256
+
+
+# a failed check, the component is the string of the checked element (USL, polymorpheme, address...)
+Violation = namedtuple('Violation', ['component', 'message'])
+
+
+class ValidationReport:
+    """The violations of the checks of an USL."""
+    def __init__(self, usl: str, violations: List[Violation]):
+        self.usl = usl
+        self.violations = violations
+
+    @property
+    def valid(self):
+        return not self.violations
+
+    def __repr__(self):
+        return "ValidationReport({!r}, {} violation(s))".format(self.usl, len(self.violations))
+
+
+class Validator:
+    """
+    Check the USLs and report all the violations, not only the first one. The verdicts of the polymorphemes and the
+    lexemes are memoized, they are shared between the USLs.
+    """
+    def __init__(self):
+        # polymorpheme -> tuple of (component, message)
+        self._polymorphemes = {}
+        # lexeme -> tuple of (component, message)
+        self._lexemes = {}
+
+    def polymorpheme_errors(self, pm: PolyMorpheme):
+        if pm not in self._polymorphemes:
+            self._polymorphemes[pm] = tuple(iter_polymorpheme_errors(pm))
+        return self._polymorphemes[pm]
+
+    def lexeme_errors(self, lexeme: Lexeme, sfun=None):
+        # the lexeme checks do not depend on the syntagmatic function
+        if lexeme not in self._lexemes:
+            self._lexemes[lexeme] = tuple(iter_lexeme_errors(lexeme, iter_pm_errors=self.polymorpheme_errors))
+        return self._lexemes[lexeme]
+
+    def word_errors(self, w: Word):
+        return iter_word_errors(w, iter_X_errors=self.lexeme_errors)
+
+    def validate(self, u: Union[str, Script, USL]) -> ValidationReport:
+        """
+        :param u: an USL, or a script or a string casted with ieml.usl.usl
+        :return: the ValidationReport of the USL, a parsing error is reported as a violation
+        """
+        from ieml.usl.usl import usl
+        from ieml.usl.decoration.instance import InstancedUSL
+
+        try:
+            u = usl(u)
+        except (CannotParse, ValueError) as e:
+            return ValidationReport(str(u), [Violation(str(u), str(e))])
+
+        if isinstance(u, Script):
+            # a morpheme parsed from a string
+            u = PolyMorpheme(constant=[u])
+
+        _u = u.usl if isinstance(u, InstancedUSL) else u
+
+        if isinstance(_u, Word):
+            errors = self.word_errors(_u)
+        elif isinstance(_u, Lexeme):
+            errors = self.lexeme_errors(_u)
+        elif isinstance(_u, PolyMorpheme):
+            errors = self.polymorpheme_errors(_u)
+        else:
+            errors = [(str(_u), "Cannot validate a {}, expected a Word, a Lexeme or a PolyMorpheme."
+                       .format(_u.__class__.__name__))]
+
+        # the nested syntagmatic functions check the same components more than once
+        violations = list(dict.fromkeys(Violation(*e) for e in errors))
+        return ValidationReport(str(u), violations)
+
+
+_validation_worker = {}
+
+
+def _init_validation_worker():
+    _validation_worker['validator'] = Validator()
+
+
+def _validate_chunk_worker(chunk):
+    return [_validation_worker['validator'].validate(u) for u in chunk]
+
+
+def validate_many(usls: Iterable[Union[str, Script, USL]], workers: int=None,
+                  chunk_size: int=VALIDATION_CHUNK_SIZE) -> List[ValidationReport]:
+    """
+    Check a collection of USLs (polymorphemes, lexemes and words) and report every violation of each of them.
+
+    :param usls: an iterable of USLs, or of scripts or strings casted with ieml.usl.usl
+    :param workers: if greater than 1, the number of processes that run the checks
+    :param chunk_size: the number of USLs sent at once to a process
+    :return: the list of the ValidationReport, in the order of the usls
+    """
+    usls = list(usls)
+
+    if workers is None or workers <= 1:
+        validator = Validator()
+        return [validator.validate(u) for u in usls]
+
+    chunks = [usls[i:i + chunk_size] for i in range(0, len(usls), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_validation_worker) as executor:
+        return [report for reports in executor.map(_validate_chunk_worker, chunks) for report in reports]
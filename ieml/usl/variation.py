@@ -7,11 +7,15 @@ from ieml.usl import USL
 
 
 class Variation(USL):
-    pass
+    __slots__ = ()
+
+    canonical_nodes = False
 
 
 
 class PolyMorphemeVariation(Variation):
+    __slots__ = ('items', 'multiplicity')
+
     def __init__(self, items, multiplicity):
         super().__init__()
         self.items = tuple(sorted(items))
@@ -43,10 +47,13 @@ class PolyMorphemeVariation(Variation):
     def do_lt(self, other):
         return (self.items, self.multiplicity) < (other.items, other.multiplicity)
 
+    def _compute_order_key(self):
+        return self.items, self.multiplicity
+
     def iter_structure(self):
         yield from self.items
 
-    def iter_structure_path(self, flexion=False):
+    def _iter_structure_path(self, flexion=False):
         for i in self.items:
             yield
 
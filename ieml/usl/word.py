@@ -3,24 +3,38 @@ from typing import Type
 
 from ieml.dictionary.script import Script
 from ieml.usl import USL
-from ieml.usl.constants import check_address_script, class_from_address
-from ieml.usl.lexeme import Lexeme, check_lexeme
+from ieml.usl.constants import iter_address_script_errors, class_from_address
+from ieml.usl.lexeme import Lexeme, iter_lexeme_errors
 from ieml.usl.syntagmatic_function import SyntagmaticFunction, SyntagmaticRole, DependantQualitySyntagmaticFunction, \
     IndependantQualitySyntagmaticFunction
 
 
 def check_word(w: 'Word'):
+    for _, message in iter_word_errors(w):
+        raise ValueError(message)
+
+
+def iter_word_errors(w: 'Word', iter_X_errors=iter_lexeme_errors):
+    """
+    Yield every violation of the word checks.
+
+    :param w: the word
+    :param iter_X_errors: the function (lexeme, sfun) that yields the violations of the lexemes
+    :return: an iterator of (component, error message)
+    """
     if not isinstance(w.role, SyntagmaticRole):
-        raise ValueError("An address of a word is expected to be a polymorpheme, not a {}."
-                         .format(w.role.__class__.__name__))
+        yield str(w.role), "An address of a word is expected to be a polymorpheme, not a {}."\
+            .format(w.role.__class__.__name__)
+        return
 
-    check_address_script(w.role.constant, sfun_type=w.syntagmatic_fun.__class__)
+    yield from iter_address_script_errors(w.role.constant, sfun_type=w.syntagmatic_fun.__class__)
 
     if not isinstance(w.syntagmatic_fun, SyntagmaticFunction):
-        raise ValueError("The word is expected to be made from a SyntagmaticFunction, not a {}."
-                         .format(w.syntagmatic_fun.__class__.__name__))
+        yield str(w.syntagmatic_fun), "The word is expected to be made from a SyntagmaticFunction, not a {}."\
+            .format(w.syntagmatic_fun.__class__.__name__)
+        return
 
-    w.syntagmatic_fun.check(Lexeme, check_lexeme, sfun_type=w.syntagmatic_fun.__class__)
+    yield from w.syntagmatic_fun.iter_errors(Lexeme, iter_X_errors, sfun_type=w.syntagmatic_fun.__class__)
 
 
 def simplify_word(w: 'Word') -> 'Word':
@@ -42,6 +56,8 @@ def simplify_word(w: 'Word') -> 'Word':
     return Word(sfun, role=w.role, context_type=w.syntagmatic_fun.__class__)
 
 class Word(USL):
+    __slots__ = ('syntagmatic_fun', 'role', 'context_type')
+
     syntactic_level = 3
 
     def __init__(self, syntagmatic_fun: SyntagmaticFunction, role: SyntagmaticRole, context_type: Type[SyntagmaticFunction]):
@@ -52,22 +68,48 @@ class Word(USL):
         self._singular_sequences = None
         self._singular_sequences_set = None
 
-        self._str = self.syntagmatic_fun.render_with_context(self.role, context=context_type)
+        if context_type is not None and self.syntagmatic_fun.get_context_role_prefix(context_type) is None:
+            raise ValueError("Invalid context to render a syntagmatic function \"{}\", expected [{}]".format(
+                str(context_type), ','))
         self.context_type = context_type
 
         self.grammatical_class = class_from_address(self.role)
 
     def _compute_singular_sequences(self):
-        sfun_ss = self.syntagmatic_fun.singular_sequences(context_type=self.context_type)
+        sfun_ss = self.syntagmatic_fun.singular_sequences_product(
+            context_type=self.context_type,
+            build=lambda sfun: Word(sfun, self.role, self.context_type),
+            decompose=lambda w: w.syntagmatic_fun if isinstance(w, Word) and w.role == self.role else None)
         if len(sfun_ss) == 1:
             return [self]
 
-        return [Word(sfun, self.role, self.context_type) for sfun in sfun_ss]
+        return sfun_ss
+
+    @property
+    def cardinal(self):
+        res = 1
+        for _, x in self.syntagmatic_fun.as_list(self.context_type):
+            res *= x.cardinal
+        return res
+
+    def _singular_sequence_at(self, i):
+        if self.is_singular:
+            return self
+
+        # mixed radix decomposition over the actors, the last one varies the fastest
+        roles, x_l = zip(*self.syntagmatic_fun.as_list(self.context_type))
+        x_l_ss = []
+        for x in reversed(x_l):
+            i, r = divmod(i, x.cardinal)
+            x_l_ss.append(x._singular_sequence_at(r))
+
+        ctx, sfun = self.syntagmatic_fun.from_list(list(zip(roles, reversed(x_l_ss))))
+        return Word(sfun, self.role, self.context_type)
 
     def iter_structure(self):
         yield from self.syntagmatic_fun.iter_structure()
 
-    def iter_structure_path(self, flexion=False):
+    def _iter_structure_path(self, flexion=False):
         from ieml.usl.decoration.path import UslPath
 
         yield (UslPath(), self)
@@ -78,8 +120,18 @@ class Word(USL):
         return self.syntagmatic_fun.empty
 
     def do_lt(self, other):
-        return self.syntagmatic_fun < other.syntagmatic_fun or \
-               (self.syntagmatic_fun == other.syntagmatic_fun and self.role < other.role)
+        return self.order_key < other.order_key
+
+    def _render(self):
+        return self.syntagmatic_fun.render_with_context(self.role, context=self.context_type)
+
+    def _compute_key(self):
+        # the context type is written in the string but not ordered
+        return self.order_key, self.context_type
+
+    def _compute_order_key(self):
+        # the syntagmatic function actors sorted by role, then the role
+        return self.syntagmatic_fun.key, self.role.key
 
     @property
     def morphemes(self):